@@ -1,15 +1,15 @@
 # -*- coding: utf-8 -*-
 
-from copy import deepcopy
-from numpy import zeros
 from PyQt5 import QtCore, QtWidgets
+from src.models.bitboard import getGrid, getSquare, unpackMovement
 from src.models.chessboard import State
-from src.models.get_available_movement import getAvailableMovement
-from src.models.eight_connectivity_two_pass import eightConnectivityTwoPass
-from src.models.monte_carlo_tree_search import monteCarloTreeSearch
+from src.models.get_available_movement import getAllAvailableMovement
+from src.models.opening_book import OpeningBook
+from src.models.search_engine import SearchEngine
+from src.models.time_manager import TimeManager
 from src.views.main_window import MainWindow
+from src.views.search_worker import SearchWorker
 from sys import argv
-from time import time
 
 class Controller(QtWidgets.QMainWindow):
     """ Class
@@ -17,6 +17,12 @@ class Controller(QtWidgets.QMainWindow):
     """
     def __init__(self, parent=None):
         super(Controller, self).__init__(parent)
+        # Kept for the whole session so the search tree and statistics are
+        # reused between moves. The opening book is used if it has been built.
+        self.search_engine = SearchEngine(opening_book=OpeningBook.loadBook(), is_instrumented=True)
+        self.search_worker = SearchWorker(self.search_engine, self)
+        self.search_worker.signal_progress.connect(self.showAiProgress)
+        self.search_worker.signal_result.connect(self.applyAiMovement)
         self.main_window = MainWindow()
         self.main_window.setupUi(self)
 
@@ -24,26 +30,61 @@ class Controller(QtWidgets.QMainWindow):
         """ Slot function
         Setup `self._available_movement`.
         """
-        available_movement = getAvailableMovement(pos_x, pos_y, State.BLACK, \
-                                                  self.main_window.chessboard.getChessboard())
+        from_square = getSquare(pos_x, pos_y)
+        available_movement = []
+        for movement in getAllAvailableMovement(State.BLACK, self.main_window.chessboard):
+            movement_from, movement_to = unpackMovement(movement)
+            if movement_from == from_square:
+                available_movement.append(list(getGrid(movement_to)))
         self.main_window.setAvailableMovement(available_movement)
     
     def aiTurnMonteCarloTreeSearch(self):
         """ Slot function
-        Monte Carlo Tree Search (MCTS) function.
+        Start the Monte Carlo Tree Search (MCTS) of the AI in the search
+        worker, so the window keeps responding while it thinks.
         """
-        chessboard = deepcopy(self.main_window.chessboard.getChessboard())
-        time_start = time()
-        from_chess, to_chess = monteCarloTreeSearch(chessboard)
-        time_end = time()
+        # The user (black chess) may have won by the last movement.
+        result = self.main_window.chessboard.getWinner(State.BLACK)
+        if result != State.EMPTY:
+            self.main_window.gameEnd(result)
+            return
+        
+        chessboard = self.main_window.chessboard
+        self.search_worker.startSearch(chessboard, State.WHITE, TimeManager.allocateTime(chessboard))
+        
+    def showAiProgress(self, iterations, iterations_per_second, best_movement, visited_times):
+        """ Slot function
+        Show the progress of the search on the statusbar.
+        """
+        from_chess, to_chess = best_movement
+        self.main_window.showStatusbarMessage('AI thinking: {} iterations ({:.0f}/s). Best: ({}, {}) -> ({}, {}), {} visits.'.format( \
+                                              iterations, iterations_per_second, from_chess[1] + 1, from_chess[0] + 1, to_chess[1] + 1, to_chess[0] + 1, visited_times))
+        
+    def applyAiMovement(self, best_movement, lasting_time):
+        """ Slot function
+        Make the movement found by the search.
+        """
+        self.main_window.is_ai_thinking = False
+        self.main_window.past_time = 0
+        # No legal movement, so the AI passes.
+        if best_movement is None:
+            self.main_window.check_exchange_turn = True
+            return
+        from_chess, to_chess = best_movement
         
         self.main_window.chessboard.setCoordinateState(from_chess[1], from_chess[0], State.EMPTY)
         self.main_window.clearChess(from_chess[1], from_chess[0])
         self.main_window.chessboard.setCoordinateState(to_chess[1], to_chess[0], State.WHITE)
         self.main_window.drawChess(to_chess[1], to_chess[0], State.WHITE)
 
-        self.main_window.lasting_time = round(time_end - time_start, 3)
+        self.main_window.lasting_time = round(lasting_time, 3)
         self.main_window.ai_move = [from_chess, to_chess]
+        self.main_window.showMoveMessage()
+        search_statistics = self.search_engine.getSearchStatistics()
+        if search_statistics is not None:
+            self.main_window.showSearchStatistics(search_statistics.formatSummary())
+        else:
+            self.main_window.showSearchStatistics('')
         
         result = self.checkGameEnd()
         if result != State.EMPTY:
@@ -51,42 +92,24 @@ class Controller(QtWidgets.QMainWindow):
         
         self.main_window.check_exchange_turn = True
         
+        # Ponder on the user's clock; the search of the next movement starts
+        # from the subtree of the user's movement.
+        if result == State.EMPTY:
+            self.search_worker.startPonder(self.main_window.chessboard, State.BLACK)
+        
+    def cancelAiTurn(self):
+        """ Slot function
+        Cancel the search or the pondering of the AI, if any.
+        """
+        self.search_worker.cancelSearch()
+        self.main_window.is_ai_thinking = False
+        
     def checkGameEnd(self):
         """
         Check if this game ends.
         """
-        # White chess won.
-        if len(self.main_window.chessboard.getChessPosition(State.BLACK)) == 1:
-            return State.WHITE
-        # Black chess won.
-        elif len(self.main_window.chessboard.getChessPosition(State.WHITE)) == 1:
-            return State.BLACK
-        else:
-            chessboard = self.main_window.chessboard.getChessboard()
-            chessboard_black = zeros([8, 8], dtype=int)
-            chessboard_white = zeros([8, 8], dtype=int)
-            
-            for i in range(8):
-                for j in range(8):
-                    if chessboard[i][j] == State.BLACK:
-                        chessboard_black[i][j] == 1
-            for i in range(8):
-                for j in range(8):
-                    if chessboard[i][j] == State.WHITE:
-                        chessboard_white[i][j] == 1
-            
-            check_black_win = eightConnectivityTwoPass(chessboard_black)
-            check_white_win = eightConnectivityTwoPass(chessboard_white)
-            
-            # Black chess won.
-            if check_black_win == 1 and check_white_win == 0:
-                return State.BLACK
-            # White chess won.
-            elif check_white_win == 1 and check_black_win == 0:
-                return State.WHITE
-            # Keep going.
-            else:
-                return State.EMPTY
+        # The AI (white chess) has just moved.
+        return self.main_window.chessboard.getWinner(State.WHITE)
     
 if __name__ == '__main__':
     """
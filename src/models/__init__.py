@@ -1,2 +1,42 @@
 # -*- coding: utf-8 -*-
 
+""" Module
+The Lines of Action engine, usable without the GUI. The names below are
+imported on first use, so importing the package loads neither PyQt5 nor
+NumPy, and NumPy is only loaded with `BatchSimulation`.
+"""
+
+from importlib import import_module
+
+# Public name: module of this package defining it.
+_EXPORTS = {
+    'BatchSimulation': 'batch_simulation',
+    'Chessboard': 'chessboard',
+    'CutoffSimulation': 'cutoff_simulation',
+    'LeafParallelSimulation': 'leaf_parallel_simulation',
+    'NodePool': 'node_pool',
+    'NodeState': 'node_state',
+    'OpeningBook': 'opening_book',
+    'SearchEngine': 'search_engine',
+    'SearchStatistics': 'search_statistics',
+    'State': 'chessboard',
+    'TimeManager': 'time_manager',
+    'TranspositionTable': 'transposition_table',
+    'getAllAvailableMovement': 'get_available_movement',
+    'getAvailableMovement': 'get_available_movement',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    """
+    Import a public name from its module on first use.
+    """
+    if name not in _EXPORTS:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module('.' + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+from numpy import arange, int16, int64, uint64, zeros
+from numpy.random import default_rng
+from .bitboard import LINE_NUM, RAY_MASKS, RAY_TARGETS, SQUARE_LINES
+from .chessboard import State
+from .node_state import NodeState
+
+_ONE = uint64(1)
+_SHIFT_1 = uint64(1)
+_SHIFT_8 = uint64(8)
+_NOT_COLUMN_0 = uint64(0xFEFEFEFEFEFEFEFE)
+_NOT_COLUMN_7 = uint64(0x7F7F7F7F7F7F7F7F)
+_SQUARE_SHIFTS = arange(64, dtype=uint64)
+
+def _buildTables():
+    """
+    Build the tables indexed by `[square, direction, distance]` from
+    `RAY_TARGETS` and `RAY_MASKS`: the bit of the destination (0 if it is off
+    the chessboard) and the bits between the square and the destination.
+    Also build the line of each square and direction, and the square-to-line
+    incidence matrix.
+    """
+    # A line holds up to 8 chess, so distances run from 0 to 8.
+    destination_bits = zeros([64, 8, 9], dtype=uint64)
+    between_bits = zeros([64, 8, 9], dtype=uint64)
+    direction_lines = zeros([64, 8], dtype=int64)
+    line_matrix = zeros([64, LINE_NUM], dtype=int16)
+    for square in range(64):
+        for line in SQUARE_LINES[square]:
+            line_matrix[square][line] = 1
+        for index in range(8):
+            direction_lines[square][index] = SQUARE_LINES[square][index >> 1]
+            for distance in range(1, 9):
+                to_square = RAY_TARGETS[square][index][distance]
+                if to_square < 0:
+                    break
+                destination_bits[square][index][distance] = uint64(1 << to_square)
+                between_bits[square][index][distance] = uint64(RAY_MASKS[square][index][distance])
+    return destination_bits, between_bits, direction_lines, line_matrix
+
+_DESTINATION_BITS, _BETWEEN_BITS, _DIRECTION_LINES, _LINE_MATRIX = _buildTables()
+
+class BatchSimulation(object):
+    """ Class
+    Describe a vectorized simulation step which scores a node by `batch_size`
+    random playouts advanced together. Each playout is a pair of uint64
+    bitboards (the side to move and the other side), and movement sampling,
+    making and game-end detection are NumPy operations over the batch.
+
+    `defaultPolicy` has the signature of the scalar `defaultPolicy` of
+    `monte_carlo_tree_search`, so it can be passed to `searchTree` instead.
+    """
+    BATCH_SIZE = 32
+
+    def __init__(self, batch_size=BATCH_SIZE, random_seed=None):
+        self._batch_size = batch_size
+        self._generator = default_rng(random_seed)
+
+    def getBatchSize(self):
+        """
+        Return the number of playouts per simulation.
+        """
+        return self._batch_size
+
+    def seedGenerator(self, random_seed=None):
+        """
+        Setup the random generator again, e.g. in a worker process which got
+        a copy of this simulation.
+        """
+        self._generator = default_rng(random_seed)
+
+    def defaultPolicy(self, state, chessboard, history=None):
+        """
+        Default policy (Simulation step). Return the mean reward of the
+        playouts from `state`, whose position is `chessboard`.
+        """
+        if state.checkTerminal():
+            return state.computeReward()
+
+        # The current turn of a state is the side which has just moved.
+        if state.getCurrentTurn() == State.BLACK:
+            chess, enemy_chess = State.WHITE, State.BLACK
+        else:
+            chess, enemy_chess = State.BLACK, State.WHITE
+        rewards = self.simulate(chessboard.getBitboard(chess), chessboard.getBitboard(enemy_chess), \
+                                chess, NodeState.MAX_ROUND - state.getCurrentRound())
+        return float(rewards.mean())
+
+    def simulate(self, own_bitboard, enemy_bitboard, chess, max_round):
+        """
+        Play `batch_size` random playouts of at most `max_round` movements
+        from a position with `chess` to move. Return the reward of every
+        playout (1 for a white win, -1 for a black win, 0 for a draw) divided
+        by its length, as the scalar default policy does.
+        """
+        batch_size = self._batch_size
+        own = zeros(batch_size, dtype=uint64) + uint64(own_bitboard)
+        enemy = zeros(batch_size, dtype=uint64) + uint64(enemy_bitboard)
+        is_active = zeros(batch_size, dtype=bool) | True
+        results = zeros(batch_size, dtype=int64)
+        lengths = zeros(batch_size, dtype=int64) + 1
+        batch_indices = arange(batch_size)
+
+        for _ in range(max_round):
+            if not is_active.any():
+                break
+            lengths += is_active
+            legal, distances = _getLegalMovement(own, enemy)
+            legal &= is_active[:, None, None]
+
+            # Sample one legal movement per playout uniformly.
+            scores = self._generator.random(legal.shape)
+            scores[~legal] = -1
+            indices = scores.reshape(batch_size, -1).argmax(1)
+            has_movement = legal.reshape(batch_size, -1).any(1)
+            # No legal movement ends the playout in a draw.
+            is_active &= has_movement
+
+            from_squares = indices >> 3
+            directions = indices & 7
+            chosen_distances = distances[batch_indices, from_squares, directions]
+            to_bits = _DESTINATION_BITS[from_squares, directions, chosen_distances]
+            from_bits = _ONE << from_squares.astype(uint64)
+            to_bits[~is_active] = 0
+            from_bits[~is_active] = 0
+
+            is_capture = (enemy & to_bits) != 0
+            own ^= from_bits | to_bits
+            enemy &= ~to_bits
+
+            # The same rule as `Chessboard.getWinner`.
+            is_mover_won = (is_capture & ((enemy & (enemy - _ONE)) == 0)) | _checkConnectivity(own)
+            is_mover_won &= is_active
+            is_enemy_won = is_active & ~is_mover_won & is_capture & _checkConnectivity(enemy)
+            mover_result = 1 if chess == State.WHITE else -1
+            results[is_mover_won] = mover_result
+            results[is_enemy_won] = -mover_result
+            is_active &= ~(is_mover_won | is_enemy_won)
+
+            own, enemy = enemy, own
+            if chess == State.BLACK:
+                chess = State.WHITE
+            else:
+                chess = State.BLACK
+
+        return results / lengths
+
+def _getLegalMovement(own, enemy):
+    """
+    Return the legal movements of the side to move of every playout as a
+    `(batch_size, 64, 8)` boolean array indexed by `[playout, square,
+    direction]`, together with the movement distances in the same shape.
+    """
+    occupancy_bits = ((own | enemy)[:, None] >> _SQUARE_SHIFTS) & _ONE
+    line_counts = occupancy_bits.astype(int16) @ _LINE_MATRIX
+    distances = line_counts[:, _DIRECTION_LINES]
+
+    square_indices = arange(64)[None, :, None]
+    direction_indices = arange(8)[None, None, :]
+    destination_bits = _DESTINATION_BITS[square_indices, direction_indices, distances]
+    between_bits = _BETWEEN_BITS[square_indices, direction_indices, distances]
+
+    own_bits = ((own[:, None] >> _SQUARE_SHIFTS) & _ONE).astype(bool)
+    legal = own_bits[:, :, None] & (destination_bits != 0) \
+            & ((destination_bits & own[:, None, None]) == 0) \
+            & ((between_bits & enemy[:, None, None]) == 0)
+    return legal, distances
+
+def _checkConnectivity(bitboards):
+    """
+    Check if each bitboard is eight-connective by a flood fill from its
+    lowest chess (see `checkEightConnectivity`).
+    """
+    region = bitboards & (~bitboards + _ONE)
+    while True:
+        grown = region | ((region >> _SHIFT_1) & _NOT_COLUMN_7) | ((region << _SHIFT_1) & _NOT_COLUMN_0)
+        grown = (grown | (grown << _SHIFT_8) | (grown >> _SHIFT_8)) & bitboards
+        if (grown == region).all():
+            return region == bitboards
+        region = grown
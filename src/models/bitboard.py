@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+""" Module
+Bitboard helpers. A square is indexed by `grid_y * 8 + grid_x`, so bit `n` of
+a bitboard is the grid `(n % 8, n // 8)` and the bit order is the same as the
+row-major order of the former 8x8 array.
+"""
+
+FULL_BITBOARD = (1 << 64) - 1
+
+# (dx, dy) of the eight directions. Opposite directions are adjacent pairs.
+DIRECTIONS = [[0, -1], [0, 1], [-1, 0], [1, 0], [-1, -1], [1, 1], [1, -1], [-1, 1]]
+
+try:
+    popCount = int.bit_count
+except AttributeError:
+    def popCount(bitboard):
+        """
+        Return the number of set bits of a bitboard.
+        """
+        return bin(bitboard).count('1')
+
+def getSquare(grid_x, grid_y):
+    """
+    Return the square index of a grid.
+    """
+    return (grid_y << 3) | grid_x
+
+def getGrid(square):
+    """
+    Return the grid `(grid_x, grid_y)` of a square index.
+    """
+    return square & 7, square >> 3
+
+def getSquares(bitboard):
+    """
+    Return the square indices of the set bits of a bitboard in ascending order.
+    """
+    squares = []
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        squares.append(lowest_bit.bit_length() - 1)
+        bitboard ^= lowest_bit
+    return squares
+
+def _buildLineMasks():
+    """
+    Build the masks of rows, columns, diagonals and anti-diagonals.
+    """
+    row_masks = [0] * 8
+    column_masks = [0] * 8
+    diagonal_masks = [0] * 15
+    antidiagonal_masks = [0] * 15
+    for grid_y in range(8):
+        for grid_x in range(8):
+            bit = 1 << getSquare(grid_x, grid_y)
+            row_masks[grid_y] |= bit
+            column_masks[grid_x] |= bit
+            diagonal_masks[grid_x - grid_y + 7] |= bit
+            antidiagonal_masks[grid_x + grid_y] |= bit
+    return row_masks, column_masks, diagonal_masks, antidiagonal_masks
+
+ROW_MASKS, COLUMN_MASKS, DIAGONAL_MASKS, ANTIDIAGONAL_MASKS = _buildLineMasks()
+
+# Lines are numbered as columns (0-7), rows (8-15), diagonals (16-30) and
+# anti-diagonals (31-45), which is the layout of `Chessboard` line counters.
+LINE_NUM = 46
+
+# Lines through each square, in the order of `DIRECTIONS` pairs: column
+# (vertical), row (horizontal), diagonal and anti-diagonal.
+SQUARE_LINES = [[square & 7, 8 + (square >> 3), 16 + (square & 7) - (square >> 3) + 7, \
+                 31 + (square & 7) + (square >> 3)] for square in range(64)]
+
+def _buildRayTables():
+    """
+    Build the destination square and the mask of the squares in between of
+    each square, direction (of `DIRECTIONS`) and distance (1-7). A
+    destination off the chessboard is -1, with an empty mask. Distances are
+    line counts, so distance 8 (a full line) is included, always off the
+    chessboard, and distance 0 is unused.
+    """
+    ray_targets = []
+    ray_masks = []
+    for square in range(64):
+        grid_x, grid_y = getGrid(square)
+        square_targets = []
+        square_masks = []
+        for direction in DIRECTIONS:
+            targets = [-1] * 9
+            masks = [0] * 9
+            between_mask = 0
+            for distance in range(1, 8):
+                to_x = grid_x + direction[0] * distance
+                to_y = grid_y + direction[1] * distance
+                if not (0 <= to_x <= 7 and 0 <= to_y <= 7):
+                    break
+                targets[distance] = getSquare(to_x, to_y)
+                masks[distance] = between_mask
+                between_mask |= 1 << targets[distance]
+            square_targets.append(targets)
+            square_masks.append(masks)
+        ray_targets.append(square_targets)
+        ray_masks.append(square_masks)
+    return ray_targets, ray_masks
+
+# `RAY_TARGETS[square][direction][distance]` and
+# `RAY_MASKS[square][direction][distance]`, so checking a movement is a table
+# lookup and a mask test against the enemy bitboard.
+RAY_TARGETS, RAY_MASKS = _buildRayTables()
+
+def packMovement(from_square, to_square):
+    """
+    Pack a movement into one integer (`from_square << 6 | to_square`).
+    """
+    return (from_square << 6) | to_square
+
+def unpackMovement(movement):
+    """
+    Return the `(from_square, to_square)` of a packed movement.
+    """
+    return movement >> 6, movement & 63
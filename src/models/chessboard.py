@@ -1,62 +1,239 @@
 # -*- coding: utf-8 -*-
 
-from numpy import zeros
+from struct import pack, unpack
+from .bitboard import LINE_NUM, SQUARE_LINES, getSquare, getSquares, popCount
+from .eight_connectivity_two_pass import checkEightConnectivity
+from .zobrist import ZOBRIST_KEYS, ZOBRIST_WHITE_TURN_KEY
 
 class Chessboard(object):
     """ Class
-    Describe Chessboard.
+    Describe Chessboard. The position is stored as one 64-bit bitboard per
+    kind of chess (see `src.models.bitboard` for the square order), together
+    with the number of chess on every column, row, diagonal and anti-diagonal
+    and the Zobrist hash key of the chess.
     """
     def __init__(self):
-        self._chessboard_state = zeros([8, 8], dtype=int)
-        for i in range(1, 7):
-            self._chessboard_state[0][i] = State.BLACK
-            self._chessboard_state[7][i] = State.BLACK
-            self._chessboard_state[i][0] = State.WHITE
-            self._chessboard_state[i][7] = State.WHITE
-            
+        self._bitboards = [0, 0, 0]
+        self._line_counts = [0] * LINE_NUM
+        self._hash_key = 0
+        self.resetChessboard()
+
     def getCoordinateState(self, grid_x, grid_y):
         """
         Return the value of a specified position of the chessboard.
         """
-        return self._chessboard_state[grid_y][grid_x]
-    
+        bit = 1 << getSquare(grid_x, grid_y)
+        if self._bitboards[State.BLACK] & bit:
+            return State.BLACK
+        elif self._bitboards[State.WHITE] & bit:
+            return State.WHITE
+        else:
+            return State.EMPTY
+
     def getChessboard(self):
         """
-        Return the chessboard.
+        Return the chessboard as 8x8 nested lists indexed by `[grid_y][grid_x]`.
         """
-        return self._chessboard_state
-    
+        return [[self.getCoordinateState(grid_x, grid_y) for grid_x in range(8)] \
+                for grid_y in range(8)]
+
+    def getBitboard(self, chess):
+        """
+        Return the bitboard of a kind of chess.
+        """
+        return self._bitboards[chess]
+
+    def getOccupancy(self):
+        """
+        Return the bitboard of all chess.
+        """
+        return self._bitboards[State.BLACK] | self._bitboards[State.WHITE]
+
     def getChessPosition(self, chess):
         """
         Return positions of a kind of chess.
         """
-        chessboard = self.getChessboard()
-        return [[i, j] for i in range(8) for j in range(8) if chessboard[i][j] == chess]
-    
+        return [[square >> 3, square & 7] for square in getSquares(self._bitboards[chess])]
+
+    def countChess(self, chess):
+        """
+        Return the number of a kind of chess.
+        """
+        return popCount(self._bitboards[chess])
+
+    def getHashKey(self, chess):
+        """
+        Return the Zobrist hash key of this position with `chess` to move.
+        """
+        if chess == State.WHITE:
+            return self._hash_key ^ ZOBRIST_WHITE_TURN_KEY
+        return self._hash_key
+
+    def getLineCounts(self):
+        """
+        Return the number of chess on each line (see `SQUARE_LINES`).
+        """
+        return self._line_counts
+
     def setCoordinateState(self, grid_x, grid_y, state):
         """
-        Setup the value of a specified position of the chessboard. 
+        Setup the value of a specified position of the chessboard.
+        """
+        square = getSquare(grid_x, grid_y)
+        bit = 1 << square
+        was_empty = (self._bitboards[State.BLACK] | self._bitboards[State.WHITE]) & bit == 0
+        self._hash_key ^= ZOBRIST_KEYS[self.getCoordinateState(grid_x, grid_y)][square]
+        self._bitboards[State.BLACK] &= ~bit
+        self._bitboards[State.WHITE] &= ~bit
+        if state != State.EMPTY:
+            self._bitboards[state] |= bit
+        self._hash_key ^= ZOBRIST_KEYS[state][square]
+
+        # Keep the line counters in step with the occupancy.
+        if was_empty and state != State.EMPTY:
+            for line in SQUARE_LINES[square]:
+                self._line_counts[line] += 1
+        elif not was_empty and state == State.EMPTY:
+            for line in SQUARE_LINES[square]:
+                self._line_counts[line] -= 1
+
+    def makeMovement(self, movement):
+        """
+        Make a packed movement in place and return its undo record, which is
+        the movement with the captured chess in bits 12-13.
+        """
+        from_square = movement >> 6
+        to_square = movement & 63
+        from_bit = 1 << from_square
+        to_bit = 1 << to_square
+        bitboards = self._bitboards
+        line_counts = self._line_counts
+
+        if bitboards[State.BLACK] & from_bit:
+            chess, enemy_chess = State.BLACK, State.WHITE
+        else:
+            chess, enemy_chess = State.WHITE, State.BLACK
+        bitboards[chess] ^= from_bit | to_bit
+        chess_keys = ZOBRIST_KEYS[chess]
+        self._hash_key ^= chess_keys[from_square] ^ chess_keys[to_square]
+        for line in SQUARE_LINES[from_square]:
+            line_counts[line] -= 1
+
+        # Capture the enemy chess; the occupancy of its lines is unchanged.
+        if bitboards[enemy_chess] & to_bit:
+            bitboards[enemy_chess] ^= to_bit
+            self._hash_key ^= ZOBRIST_KEYS[enemy_chess][to_square]
+            return movement | (enemy_chess << 12)
+        for line in SQUARE_LINES[to_square]:
+            line_counts[line] += 1
+        return movement
+
+    def unmakeMovement(self, undo_record):
+        """
+        Take back a movement by the undo record returned from `makeMovement`.
+        """
+        from_square = (undo_record >> 6) & 63
+        to_square = undo_record & 63
+        captured_chess = undo_record >> 12
+        from_bit = 1 << from_square
+        to_bit = 1 << to_square
+        bitboards = self._bitboards
+        line_counts = self._line_counts
+
+        if bitboards[State.BLACK] & to_bit:
+            chess = State.BLACK
+        else:
+            chess = State.WHITE
+        bitboards[chess] ^= from_bit | to_bit
+        chess_keys = ZOBRIST_KEYS[chess]
+        self._hash_key ^= chess_keys[from_square] ^ chess_keys[to_square]
+        for line in SQUARE_LINES[from_square]:
+            line_counts[line] += 1
+
+        if captured_chess != State.EMPTY:
+            bitboards[captured_chess] |= to_bit
+            self._hash_key ^= ZOBRIST_KEYS[captured_chess][to_square]
+        else:
+            for line in SQUARE_LINES[to_square]:
+                line_counts[line] -= 1
+
+    def getWinner(self, chess, undo_record=None):
+        """
+        Return the winner after `chess` moved, or `State.EMPTY` if the game
+        goes on. If a movement connects both sides, the mover wins. Since a
+        game only goes on while neither side is connected, the enemy chess is
+        checked only if the movement (given by its undo record) captured.
+        """
+        if chess == State.BLACK:
+            enemy_chess = State.WHITE
+        else:
+            enemy_chess = State.BLACK
+        is_capture = undo_record is None or undo_record >> 12 != State.EMPTY
+
+        if is_capture and popCount(self._bitboards[enemy_chess]) <= 1:
+            return chess
+        elif checkEightConnectivity(self._bitboards[chess]):
+            return chess
+        elif is_capture and checkEightConnectivity(self._bitboards[enemy_chess]):
+            return enemy_chess
+        else:
+            return State.EMPTY
+
+    def copyChessboard(self):
+        """
+        Return a copy of the chessboard.
         """
-        self._chessboard_state[grid_y][grid_x] = state
-    
+        chessboard = Chessboard.__new__(Chessboard)
+        chessboard._bitboards = self._bitboards[:]
+        chessboard._line_counts = self._line_counts[:]
+        chessboard._hash_key = self._hash_key
+        return chessboard
+
+    def setBitboards(self, black_bitboard, white_bitboard):
+        """
+        Setup the chessboard from the bitboards of black and white chess.
+        """
+        self._bitboards = [0, 0, 0]
+        self._line_counts = [0] * LINE_NUM
+        self._hash_key = 0
+        for square in getSquares(black_bitboard):
+            self.setCoordinateState(square & 7, square >> 3, State.BLACK)
+        for square in getSquares(white_bitboard):
+            self.setCoordinateState(square & 7, square >> 3, State.WHITE)
+
+    def packChessboard(self):
+        """
+        Return the chessboard packed into 16 bytes (the bitboards of black
+        and white chess).
+        """
+        return pack('<QQ', self._bitboards[State.BLACK], self._bitboards[State.WHITE])
+
+    def unpackChessboard(self, data):
+        """
+        Setup the chessboard from the bytes returned by `packChessboard`.
+        """
+        self.setBitboards(*unpack('<QQ', data))
+
+    def __deepcopy__(self, memo):
+        return self.copyChessboard()
+
     def resetChessboard(self):
         """
         Reset the chessboard state.
         """
-        for i in range(8):
-            for j in range(8):
-                self._chessboard_state[i][j] = State.EMPTY
-        
+        self._bitboards = [0, 0, 0]
+        self._line_counts = [0] * LINE_NUM
+        self._hash_key = 0
         for i in range(1, 7):
-            self._chessboard_state[0][i] = State.BLACK
-            self._chessboard_state[7][i] = State.BLACK
-            self._chessboard_state[i][0] = State.WHITE
-            self._chessboard_state[i][7] = State.WHITE
-        
+            self.setCoordinateState(i, 0, State.BLACK)
+            self.setCoordinateState(i, 7, State.BLACK)
+            self.setCoordinateState(0, i, State.WHITE)
+            self.setCoordinateState(7, i, State.WHITE)
+
 class State(object):
     """ Class
     Describe chess states.
     """
     EMPTY = 0
     BLACK = 1
-    WHITE = 2
\ No newline at end of file
+    WHITE = 2
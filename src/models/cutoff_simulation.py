@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from random import choice, random
+from .bitboard import unpackMovement
+from .evaluation import evaluateChessboard, getCenterOfMass
+from .get_available_movement import getAllAvailableMovement
+from .node_state import NodeState
+
+class CutoffSimulation(object):
+    """ Class
+    Describe a simulation step which plays at most `cutoff_depth` movements
+    and scores an unfinished playout by `evaluateChessboard` instead of
+    playing on to `NodeState.MAX_ROUND`.
+
+    With `epsilon`, the playout is heavy (epsilon-greedy): a random movement
+    is played with probability `epsilon`, and otherwise the movement which
+    brings the chess closest to the centre of mass of its side, preferring
+    captures. `defaultPolicy` has the signature of the scalar `defaultPolicy`
+    of `monte_carlo_tree_search`, so it can be passed to `searchTree` instead.
+    """
+    CUTOFF_DEPTH = 8
+    # Bonus of a capture over one step towards the centre of mass.
+    CAPTURE_BONUS = 0.5
+
+    def __init__(self, cutoff_depth=CUTOFF_DEPTH, epsilon=None):
+        self._cutoff_depth = cutoff_depth
+        self._epsilon = epsilon
+
+    def getCutoffDepth(self):
+        """
+        Return the largest number of movements of a playout.
+        """
+        return self._cutoff_depth
+
+    def getEpsilon(self):
+        """
+        Return the probability of a random movement in a heavy playout, or
+        None for uniformly random playouts.
+        """
+        return self._epsilon
+
+    def defaultPolicy(self, state, chessboard, history):
+        """
+        Default policy (Simulation step).
+        """
+        current_state = state.copyState()
+
+        children_nodes_num = 1
+        for _ in range(self._cutoff_depth):
+            if current_state.checkTerminal():
+                break
+            children_nodes_num += 1
+            chess = current_state.getNextTurn()
+            available_movement = getAllAvailableMovement(chess, chessboard)
+            if len(available_movement) == 0:
+                current_state.setEndState(NodeState.STALEMATE)
+                break
+            if self._epsilon is None or random() < self._epsilon:
+                movement = choice(available_movement)
+            else:
+                movement = self.selectGreedyMovement(chessboard, chess, available_movement)
+            current_state.makeMovement(chessboard, history, movement)
+
+        if current_state.checkTerminal():
+            reward = current_state.computeReward()
+        else:
+            reward = evaluateChessboard(chessboard)
+
+        return reward / children_nodes_num
+
+    def selectGreedyMovement(self, chessboard, chess, available_movement):
+        """
+        Return the movement of `chess` which gains the most towards the centre
+        of mass of its side, with `CAPTURE_BONUS` for a capture.
+        """
+        center_x, center_y = getCenterOfMass(chessboard.getBitboard(chess))
+        enemy_bitboard = chessboard.getOccupancy() ^ chessboard.getBitboard(chess)
+        best_score = None
+        best_movement = None
+        for movement in available_movement:
+            from_square, to_square = unpackMovement(movement)
+            score = max(abs((from_square & 7) - center_x), abs((from_square >> 3) - center_y)) \
+                    - max(abs((to_square & 7) - center_x), abs((to_square >> 3) - center_y))
+            if enemy_bitboard >> to_square & 1:
+                score += CutoffSimulation.CAPTURE_BONUS
+            if best_score is None or score > best_score:
+                best_score = score
+                best_movement = movement
+        return best_movement
@@ -1,74 +1,107 @@
 # -*- coding: utf-8 -*-
 
-from numpy import zeros
-from src.models.chessboard import State
+from .bitboard import FULL_BITBOARD, getSquares, popCount
 
-def eightConnectivityTwoPass(chessboard):
+_NOT_COLUMN_0 = FULL_BITBOARD ^ 0x0101010101010101
+_NOT_COLUMN_7 = FULL_BITBOARD ^ 0x8080808080808080
+
+def _buildPreviousNeighbors():
+    """
+    Build the neighbors of each square which are scanned before it (west,
+    north-west, north and north-east).
+    """
+    previous_neighbors = []
+    for square in range(64):
+        grid_x, grid_y = square & 7, square >> 3
+        neighbors = []
+        for dx, dy in [[-1, 0], [-1, -1], [0, -1], [1, -1]]:
+            if 0 <= grid_x + dx <= 7 and 0 <= grid_y + dy <= 7:
+                neighbors.append(square + dy * 8 + dx)
+        previous_neighbors.append(neighbors)
+    return previous_neighbors
+
+_PREVIOUS_NEIGHBORS = _buildPreviousNeighbors()
+
+def checkEightConnectivity(bitboard):
     """
-    Two-pass algorithm to check if the input image is eight-connective.
+    Check if the input bitboard is eight-connective by flood-filling from its
+    lowest chess until the filled region stops growing.
+    """
+    chess_num = popCount(bitboard)
+    if chess_num <= 1:
+        return True
+
+    # A connected group of n chess spans at most n - 1 rows and columns.
+    if ((bitboard.bit_length() - 1) >> 3) - (((bitboard & -bitboard).bit_length() - 1) >> 3) \
+       >= chess_num:
+        return False
+    columns = bitboard | (bitboard >> 32)
+    columns |= columns >> 16
+    columns = (columns | (columns >> 8)) & 0xFF
+    if (columns.bit_length() - 1) - ((columns & -columns).bit_length() - 1) >= chess_num:
+        return False
+
+    region = bitboard & -bitboard
+    while True:
+        grown = region | ((region >> 1) & _NOT_COLUMN_7) | ((region << 1) & _NOT_COLUMN_0)
+        grown = (grown | (grown << 8) | (grown >> 8)) & bitboard
+        if grown == region:
+            return region == bitboard
+        region = grown
+
+def countGroups(bitboard):
     """
-    chessboard_labels = zeros([8, 8], dtype=int)
-    
-    index = 1
-    check_connective = True
-    check_first_chess = True
-    for iter_time in range(2):
-        for i in range(8):
-            for j in range(8):
-                if chessboard[i][j] != State.EMPTY:
-                    if index == 1 and check_first_chess:
-                        chessboard_labels[i][j] = 1
-                        check_connective = True
-                        check_first_chess = False
-                    else:
-                        neighbors = findNeighborsWithoutZeros(i, j, chessboard_labels)
-                        if len(neighbors) == 0:
-                            if check_connective == False:
-                                index += 1
-                            chessboard_labels[i][j] = index
-                        else:
-                            chessboard_labels[i][j] = min(neighbors)
-                        check_connective = True
-                else:
-                    check_connective = False
-    
+    Return the number of eight-connected groups of the input bitboard.
+    """
+    group_num = 0
+    while bitboard:
+        region = bitboard & -bitboard
+        while True:
+            grown = region | ((region >> 1) & _NOT_COLUMN_7) | ((region << 1) & _NOT_COLUMN_0)
+            grown = (grown | (grown << 8) | (grown >> 8)) & bitboard
+            if grown == region:
+                break
+            region = grown
+        bitboard ^= region
+        group_num += 1
+    return group_num
+
+def eightConnectivityTwoPass(bitboard):
+    """
+    Two-pass algorithm to check if the input bitboard is eight-connective.
+    """
+    chessboard_labels = [0] * 64
+    # Equivalence of labels; `label_parents[label]` is the parent label.
+    label_parents = [0]
+
+    squares = getSquares(bitboard)
+    for square in squares:
+        neighbors = [chessboard_labels[i] for i in _PREVIOUS_NEIGHBORS[square] \
+                     if chessboard_labels[i] != 0]
+        if len(neighbors) == 0:
+            chessboard_labels[square] = len(label_parents)
+            label_parents.append(len(label_parents))
+        else:
+            roots = [findRootLabel(label, label_parents) for label in neighbors]
+            root = min(roots)
+            for label in roots:
+                label_parents[label] = root
+            chessboard_labels[square] = root
+
     chess_label = 0
-    for i in range(8):
-        for j in range(8):
-            if chess_label == 0:
-                chess_label = chessboard_labels[i][j]
-            else:
-                if chess_label != chessboard_labels[i][j]:
-                    return 0
-    
+    for square in squares:
+        label = findRootLabel(chessboard_labels[square], label_parents)
+        if chess_label == 0:
+            chess_label = label
+        elif chess_label != label:
+            return 0
+
     return 1
-                
-def findNeighborsWithoutZeros(self, row, column, chessboard_labels):
+
+def findRootLabel(label, label_parents):
     """
-    Find the surronding pixels values of a specified position.
+    Find the smallest equivalent label of a specified label.
     """
-    mask_range = []
-    if row == 0:
-        mask_range.append(row)
-        mask_range.append(row + 1)
-    elif row == 7:
-        mask_range.append(row - 1)
-        mask_range.append(row)
-    else:
-        mask_range.append(row - 1)
-        mask_range.append(row + 1)
-    
-    if column == 0:
-        mask_range.append(column)
-        mask_range.append(column + 1)
-    elif row == 7:
-        mask_range.append(column - 1)
-        mask_range.append(column)
-    else:
-        mask_range.append(column - 1)
-        mask_range.append(column + 1)
-    
-    tmp = [i[mask_range[2]: mask_range[3] + 1] \
-           for i in chessboard_labels[mask_range[0]: mask_range[1] + 1]]            
-    
-    return [j for i in tmp for j in i if j != 0]
\ No newline at end of file
+    while label_parents[label] != label:
+        label = label_parents[label]
+    return label
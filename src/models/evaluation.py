@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+""" Module
+Static evaluation of Lines of Action positions, used to score playouts cut
+off before the game ends. A side is better when its chess are concentrated
+around their centre of mass, form many quads (2x2 squares holding at least
+three of its chess), have many legal movements and fall into few groups.
+"""
+
+from math import tanh
+from .bitboard import FULL_BITBOARD, getSquares, popCount
+from .chessboard import State
+from .eight_connectivity_two_pass import countGroups
+from .get_available_movement import getAllAvailableMovement
+
+# Weights of the feature differences (white minus black).
+CONCENTRATION_WEIGHT = 0.5
+QUAD_WEIGHT = 0.15
+MOBILITY_WEIGHT = 0.02
+GROUP_WEIGHT = 0.2
+
+# Top-left squares of the 2x2 quads, i.e. not in column 7 or row 7.
+_QUAD_ANCHORS = FULL_BITBOARD ^ 0x8080808080808080 ^ 0xFF00000000000000
+
+def evaluateChessboard(chessboard):
+    """
+    Return the value of `chessboard` from the view of white chess, in
+    `(-1, 1)` like the reward of a finished game.
+    """
+    score = CONCENTRATION_WEIGHT * (getCenterDistance(chessboard.getBitboard(State.BLACK)) - \
+                                    getCenterDistance(chessboard.getBitboard(State.WHITE))) \
+            + QUAD_WEIGHT * (countQuads(chessboard.getBitboard(State.WHITE)) - \
+                             countQuads(chessboard.getBitboard(State.BLACK))) \
+            + MOBILITY_WEIGHT * (len(getAllAvailableMovement(State.WHITE, chessboard)) - \
+                                 len(getAllAvailableMovement(State.BLACK, chessboard))) \
+            + GROUP_WEIGHT * (countGroups(chessboard.getBitboard(State.BLACK)) - \
+                              countGroups(chessboard.getBitboard(State.WHITE)))
+    return tanh(score)
+
+def getCenterOfMass(bitboard):
+    """
+    Return the centre of mass `(grid_x, grid_y)` of the chess of a bitboard.
+    """
+    squares = getSquares(bitboard)
+    if not squares:
+        return 0, 0
+    sum_x = 0
+    sum_y = 0
+    for square in squares:
+        sum_x += square & 7
+        sum_y += square >> 3
+    return sum_x / len(squares), sum_y / len(squares)
+
+def getCenterDistance(bitboard):
+    """
+    Return the mean distance (king moves) of the chess of a bitboard to their
+    centre of mass.
+    """
+    squares = getSquares(bitboard)
+    if not squares:
+        return 0
+    center_x, center_y = getCenterOfMass(bitboard)
+    total_distance = 0
+    for square in squares:
+        total_distance += max(abs((square & 7) - center_x), abs((square >> 3) - center_y))
+    return total_distance / len(squares)
+
+def countQuads(bitboard):
+    """
+    Return the number of 2x2 squares holding at least three chess of a
+    bitboard.
+    """
+    east = bitboard >> 1
+    south = bitboard >> 8
+    south_east = bitboard >> 9
+    quads = (bitboard & east & (south | south_east)) | (south & south_east & (bitboard | east))
+    return popCount(quads & _QUAD_ANCHORS)
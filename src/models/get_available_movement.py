@@ -1,77 +1,96 @@
 # -*- coding: utf-8 -*-
 
-from src.models.chessboard import State
+from .bitboard import RAY_MASKS, RAY_TARGETS, SQUARE_LINES, getGrid, getSquare, getSquares
+from .chessboard import State
 
 def getAvailableMovement(pos_x, pos_y, chess, chessboard):
     """
     Return the legal movements.
     """
-    available_movement = []
     if chess == State.BLACK:
         enemy_chess = State.WHITE
     else:
         enemy_chess = State.BLACK
-        
-    count_ver = sum([1 for i in chessboard if i[pos_x] != State.EMPTY])
-    count_hor = sum([1 for i in chessboard[pos_y] if i != State.EMPTY])
-    start = min(pos_x, pos_y)
-    diff = abs(pos_x - pos_y)
-    count_diagonal = sum([1 for i in range(7 - diff + 1) \
-                          if chessboard[pos_y - start + i][pos_x - start + i] != State.EMPTY])
-    start = pos_x + pos_y
-    diff = max(start - 7, 0)
-    start -= diff
-    count_paradiagonal = sum([1 for i in range(start - diff + 1) \
-                              if chessboard[start - i][diff + i] != State.EMPTY])
 
-    # Vertical (x-direction).
-    if pos_y - count_ver >= 0 and chessboard[pos_y - count_ver][pos_x] != chess:
-        count_invalid = sum([1 for i in range(pos_y - count_ver + 1, pos_y) \
-                             if chessboard[i][pos_x] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x, pos_y - count_ver])
-    if pos_y + count_ver <= 7 and chessboard[pos_y + count_ver][pos_x] != chess:
-        count_invalid = sum([1 for i in range(pos_y + 1, pos_y + count_ver + 1 - 1) \
-                             if chessboard[i][pos_x] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x, pos_y + count_ver])
-    
-    # Horizontal (y-direction).
-    if pos_x - count_hor >= 0 and chessboard[pos_y][pos_x - count_hor] != chess:
-        count_invalid = sum([1 for i in range(pos_x - count_hor + 1, pos_x) \
-                             if chessboard[pos_y][i] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x - count_hor, pos_y]) 
-    if pos_x + count_hor <= 7 and chessboard[pos_y][pos_x + count_hor] != chess:
-        count_invalid = sum([1 for i in range(pos_x + 1, pos_x + count_hor + 1 - 1) \
-                             if chessboard[pos_y][i] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x + count_hor, pos_y]) 
-            
-    # Diagonal.
-    if min(pos_x, pos_y) - count_diagonal >= 0 and chessboard[pos_y - count_diagonal][pos_x - count_diagonal] != chess:
-        count_invalid = sum([1 for i in range(1, count_diagonal + 1 - 1) \
-                             if chessboard[pos_y - i][pos_x - i] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x - count_diagonal, pos_y - count_diagonal])
-    if max(pos_x, pos_y) + count_diagonal <= 7 and chessboard[pos_y + count_diagonal][pos_x + count_diagonal] != chess:
-        count_invalid = sum([1 for i in range(1, count_diagonal + 1 - 1) \
-                             if chessboard[pos_y + i][pos_x + i] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x + count_diagonal, pos_y + count_diagonal])
-            
-    # Paradiagonal.
-    if pos_y - count_paradiagonal >= 0 and pos_x + count_paradiagonal <= 7 \
-    and chessboard[pos_y - count_paradiagonal][pos_x + count_paradiagonal] != chess:
-        count_invalid = sum([1 for i in range(1, count_paradiagonal + 1 - 1) \
-                             if chessboard[pos_y - i][pos_x + i] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x + count_paradiagonal, pos_y - count_paradiagonal])
-    if pos_x - count_paradiagonal >= 0 and pos_y + count_paradiagonal <= 7 \
-    and chessboard[pos_y + count_paradiagonal][pos_x - count_paradiagonal] != chess:
-        count_invalid = sum([1 for i in range(1, count_paradiagonal + 1 - 1) \
-                             if chessboard[pos_y + i][pos_x - i] == enemy_chess])
-        if count_invalid == 0:
-            available_movement.append([pos_x - count_paradiagonal, pos_y + count_paradiagonal])
+    to_squares = getSquareMovement(getSquare(pos_x, pos_y), chessboard.getBitboard(chess), \
+                                   chessboard.getBitboard(enemy_chess), chessboard.getLineCounts())
+    return [list(getGrid(to_square)) for to_square in to_squares]
+
+def getAllAvailableMovement(chess, chessboard):
+    """
+    Return the legal movements of all chess of a side as packed movements
+    (see `packMovement`). An empty list means the side cannot move.
+    """
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+
+    own_bitboard = chessboard.getBitboard(chess)
+    enemy_bitboard = chessboard.getBitboard(enemy_chess)
+    line_counts = chessboard.getLineCounts()
 
+    available_movement = []
+    for from_square in getSquares(own_bitboard):
+        from_bits = from_square << 6
+        for to_square in getSquareMovement(from_square, own_bitboard, enemy_bitboard, line_counts):
+            available_movement.append(from_bits | to_square)
     return available_movement
+
+def countAvailableMovement(chess, chessboard):
+    """
+    Return the number of legal movements of all chess of a side, without
+    packing them.
+    """
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+
+    own_bitboard = chessboard.getBitboard(chess)
+    enemy_bitboard = chessboard.getBitboard(enemy_chess)
+    line_counts = chessboard.getLineCounts()
+
+    movement_num = 0
+    for from_square in getSquares(own_bitboard):
+        movement_num += len(getSquareMovement(from_square, own_bitboard, enemy_bitboard, line_counts))
+    return movement_num
+
+def checkAvailableMovement(chess, chessboard):
+    """
+    Check if a side has at least one legal movement.
+    """
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+
+    own_bitboard = chessboard.getBitboard(chess)
+    enemy_bitboard = chessboard.getBitboard(enemy_chess)
+    line_counts = chessboard.getLineCounts()
+
+    for from_square in getSquares(own_bitboard):
+        if getSquareMovement(from_square, own_bitboard, enemy_bitboard, line_counts):
+            return True
+    return False
+
+def getSquareMovement(from_square, own_bitboard, enemy_bitboard, line_counts):
+    """
+    Return the destination squares of the chess on a specified square.
+    """
+    to_squares = []
+    lines = SQUARE_LINES[from_square]
+    ray_targets = RAY_TARGETS[from_square]
+    ray_masks = RAY_MASKS[from_square]
+
+    for index in range(8):
+        # Opposite directions share the same line and the same count.
+        distance = line_counts[lines[index >> 1]]
+        to_square = ray_targets[index][distance]
+        if to_square < 0 or own_bitboard >> to_square & 1:
+            continue
+        # A chess cannot jump over enemy chess.
+        if enemy_bitboard & ray_masks[index][distance] == 0:
+            to_squares.append(to_square)
+
+    return to_squares
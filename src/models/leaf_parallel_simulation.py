@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from random import seed
+from struct import pack, unpack
+from .chessboard import Chessboard
+from .node_state import NodeState
+
+class LeafParallelSimulation(object):
+    """ Class
+    Describe a long-lived process pool which plays the playouts of batches of
+    leaf positions for leaf-parallel MCTS (see `searchTreeLeafParallel`).
+    The pool is created once and reused by every search until `close`.
+    Positions are sent as packed bytes (see `packLeaf`). The workers play
+    `default_policy` (see `searchTree`), which must be picklable, such as
+    a function of a module or a method of `CutoffSimulation` or
+    `BatchSimulation`.
+    """
+    # Leaves per worker process in one batch.
+    LEAVES_PER_WORKER = 2
+
+    def __init__(self, worker_num, leaves_per_worker=LEAVES_PER_WORKER, default_policy=None):
+        self._worker_num = worker_num
+        self._batch_size = worker_num * leaves_per_worker
+        # Imported here so that importing this module stays cheap.
+        from multiprocessing import Pool
+        self._pool = Pool(worker_num, initializer=_initializeWorker, initargs=(default_policy,))
+
+    def getWorkerNum(self):
+        """
+        Return the number of worker processes.
+        """
+        return self._worker_num
+
+    def getBatchSize(self):
+        """
+        Return the number of leaves per batch.
+        """
+        return self._batch_size
+
+    def simulateLeaves(self, packed_leaves):
+        """
+        Return the rewards of the playouts of packed leaves, in order.
+        """
+        return self._pool.map(_simulateLeaf, packed_leaves)
+
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+def packLeaf(chessboard, state):
+    """
+    Pack the position of a leaf (`chessboard`) and its state into 18 bytes.
+    """
+    return chessboard.packChessboard() + pack('<BB', state.getCurrentTurn(), state.getCurrentRound())
+
+def seedWorker(default_policy=None, random_seed=None):
+    """
+    Seed the random generator of a worker process with `random_seed`, or
+    from the system if it is None, and that of `default_policy` too if the
+    policy has its own (`BatchSimulation`).
+    """
+    seed(random_seed)
+    policy_owner = getattr(default_policy, '__self__', None)
+    if hasattr(policy_owner, 'seedGenerator'):
+        policy_owner.seedGenerator(random_seed)
+
+# The default policy of a worker process, or None for random playouts.
+_worker_default_policy = None
+
+def _initializeWorker(default_policy=None):
+    """
+    Setup the default policy of a worker process, and give it its own random
+    seed; forked workers would share the state of the parent otherwise.
+    """
+    global _worker_default_policy
+    _worker_default_policy = default_policy
+    seedWorker(default_policy)
+
+def _simulateLeaf(packed_leaf):
+    """
+    Play the playout of a packed leaf in a worker process.
+    """
+    default_policy = _worker_default_policy
+    if default_policy is None:
+        # Imported here to avoid a circular import with `monte_carlo_tree_search`.
+        from .monte_carlo_tree_search import defaultPolicy as default_policy
+
+    chessboard = Chessboard()
+    chessboard.unpackChessboard(packed_leaf[:16])
+    current_turn, current_round = unpack('<BB', packed_leaf[16:])
+    state = NodeState()
+    state.setCurrentTurn(current_turn)
+    state.setCurrentRound(current_round)
+    return default_policy(state, chessboard, [])
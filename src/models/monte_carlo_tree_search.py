@@ -1,101 +1,548 @@
 # -*- coding: utf-8 -*-
 
 from math import log, sqrt
-from src.models.chessboard import State
-from src.models.node_state import NodeState
-from src.models.tree_node import TreeNode
+from random import getrandbits, shuffle
 from sys import maxsize
+from time import perf_counter
+from .chessboard import Chessboard, State
+from .get_available_movement import getAllAvailableMovement
+from .leaf_parallel_simulation import packLeaf, seedWorker
+from .node_pool import NodePool
+from .node_state import NodeState
+from .tactics import findWinningMovement, getSafeMovements
+from .time_manager import TimeManager
+from .transposition_table import TranspositionTable
 
 COMPUTATION_LIMIT = 100
+# Visits (each a loss for the side choosing the node) added on the path of a
+# leaf in flight in leaf-parallel MCTS.
+VIRTUAL_LOSS = 1
+# Seconds between two progress reports of a search.
+PROGRESS_INTERVAL = 0.25
+# Progressive widening: a node visited n times may have up to
+# WIDENING_CONST * n ** WIDENING_EXPONENT children.
+WIDENING_CONST = 1
+WIDENING_EXPONENT = 0.5
 
-def monteCarloTreeSearch(chessboard):
+def monteCarloTreeSearch(chessboard, transposition_table=None, time_limit=None, node_limit=None, \
+                         worker_num=1, pool=None, default_policy=None):
     """
-    Main function of Monte Carlo Tree Search (MCTS).
+    Main function of Monte Carlo Tree Search (MCTS). Statistics are shared
+    with `transposition_table`, which may be kept for a whole game. The search
+    runs until `time_limit` seconds or `node_limit` iterations are spent
+    (`COMPUTATION_LIMIT` iterations if neither is given) and returns the best
+    movement found so far. If `worker_num` is more than 1, the search is
+    root-parallel (see `searchRootParallel`); its trees live in other
+    processes, so a `transposition_table` cannot be shared with them and
+    raises ValueError. See `searchTree` for `default_policy`. A movement
+    which wins at once is returned without a search.
     """
-    init_state = NodeState(chessboard)
-    init_state.setCurrentTurn(State.BLACK)
-    init_node = TreeNode(init_state)
+    if worker_num > 1 and transposition_table is not None:
+        raise ValueError('A transposition table cannot be shared with root-parallel workers.')
+    winning_movement = findWinningMovement(State.WHITE, chessboard)
+    if winning_movement is not None:
+        return NodeState(winning_movement).getBestMovement()
+    
+    if worker_num > 1:
+        if time_limit is None and node_limit is None:
+            node_limit = COMPUTATION_LIMIT
+        root_statistics, _ = searchRootParallel(chessboard, worker_num, time_limit, node_limit, pool, \
+                                                default_policy)
+        return findMostVisitedMovement(root_statistics)
+    
+    if transposition_table is None:
+        transposition_table = TranspositionTable()
+    transposition_table.newSearch()
+    if time_limit is None and node_limit is None:
+        node_limit = COMPUTATION_LIMIT
+    
+    node_pool = NodePool()
+    init_node = node_pool.addNode(NodePool.NULL_NODE, 0, chessboard.getHashKey(State.WHITE), State.BLACK, 0)
+    pruneRootMovements(node_pool, init_node, chessboard)
+
+    searchTree(node_pool, init_node, chessboard, TimeManager(time_limit, node_limit), transposition_table, \
+               default_policy=default_policy)
+        
+    best_child_node = findMostVisitedChild(node_pool, init_node)
+    if best_child_node == NodePool.NULL_NODE:
+        return None
+    return node_pool.getBestMovement(best_child_node)
 
-    for _ in range(COMPUTATION_LIMIT):
-        expanded_node = treePolicy(init_node)
-        reward = defaultPolicy(expanded_node)
-        backPropagation(expanded_node, reward)
+def searchTree(node_pool, init_node, chessboard, time_manager, transposition_table=None, progress_callback=None, \
+               default_policy=None, is_widening=False, search_statistics=None):
+    """
+    Run MCTS iterations from `init_node` of `node_pool`, whose position is
+    `chessboard`, until `time_manager` stops the search. Return the number of
+    iterations. `progress_callback(iterations, elapsed_time, node_pool,
+    init_node)` is called every `PROGRESS_INTERVAL` seconds.
+    `default_policy(state, chessboard, history)` is the simulation step
+    (`defaultPolicy` if None), e.g. `BatchSimulation.defaultPolicy`. See
+    `treePolicy` for `is_widening`.
+
+    Proven wins and losses are propagated up the tree (MCTS-Solver, see
+    `propagateProof`), and the search returns at once when `init_node` is
+    proven. If `search_statistics` (a `SearchStatistics`) is given, the time
+    of each phase and the tree reached are recorded in it.
+    """
+    if default_policy is None:
+        default_policy = defaultPolicy
+    
+    # Scratch position. Every iteration makes its movements on it and takes
+    # them back afterwards, so no chessboard is copied during the search.
+    chessboard = chessboard.copyChessboard()
+    history = []
+    
+    time_manager.startSearch()
+    iterations = 0
+    next_progress_time = PROGRESS_INTERVAL
+    while node_pool.getProof(init_node) == 0 and not time_manager.checkStop(iterations, node_pool, init_node):
+        if search_statistics is not None:
+            time_start = perf_counter()
+        expanded_node = treePolicy(node_pool, init_node, chessboard, history, transposition_table, is_widening, \
+                                   search_statistics)
+        if search_statistics is not None:
+            time_tree_policy = perf_counter()
+            depth = len(history)
+            search_statistics.addPhaseTime('treePolicy', time_tree_policy - time_start)
+        if node_pool.checkTerminal(expanded_node):
+            propagateProof(node_pool, expanded_node)
+            reward = node_pool.computeReward(expanded_node)
+            playout_length = 0
+        else:
+            reward = default_policy(node_pool.getState(expanded_node), chessboard, history)
+            if search_statistics is not None:
+                search_statistics.addPhaseTime('defaultPolicy', perf_counter() - time_tree_policy)
+                # A policy which plays on its own board (`BatchSimulation`)
+                # makes no movements on the scratch chessboard.
+                playout_length = len(history) - depth or None
+        if search_statistics is not None:
+            time_default_policy = perf_counter()
+        backPropagation(node_pool, expanded_node, reward, transposition_table)
+        if search_statistics is not None:
+            search_statistics.addPhaseTime('backPropagation', perf_counter() - time_default_policy)
+            search_statistics.addIteration(depth, playout_length)
+        iterations += 1
         
-    best_child_node = findBestChild(init_node, False)
-    return best_child_node.getState().getBestMovement()
+        # Restore the root position.
+        while history:
+            chessboard.unmakeMovement(history.pop())
         
-def treePolicy(node):
+        if progress_callback is not None:
+            elapsed_time = time_manager.getElapsedTime()
+            if elapsed_time >= next_progress_time:
+                progress_callback(iterations, elapsed_time, node_pool, init_node)
+                next_progress_time = elapsed_time + PROGRESS_INTERVAL
+    
+    if search_statistics is not None:
+        search_statistics.setElapsedTime(time_manager.getElapsedTime())
+        search_statistics.collectTreeStatistics(node_pool, init_node)
+    return iterations
+        
+def searchTreeLeafParallel(node_pool, init_node, chessboard, time_manager, simulation, transposition_table=None, \
+                           progress_callback=None, is_widening=False, search_statistics=None):
     """
-    Tree policy (Selection and expansion steps).
+    Leaf-parallel MCTS. The selection and expansion steps run here; each
+    batch of `simulation.getBatchSize()` leaves is sent as packed positions
+    to the process pool of `simulation` (a `LeafParallelSimulation`) for the
+    simulation step. Leaves in flight carry a virtual loss on their path so
+    the batch spreads over the tree. Arguments and return value are as in
+    `searchTree`.
     """
-    while not node.getState().checkTerminal():
-        if node.checkFullyExpanded():
-            node = findBestChild(node, True)
+    chessboard = chessboard.copyChessboard()
+    history = []
+    
+    time_manager.startSearch()
+    iterations = 0
+    next_progress_time = PROGRESS_INTERVAL
+    while node_pool.getProof(init_node) == 0 and not time_manager.checkStop(iterations, node_pool, init_node):
+        leaf_nodes = []
+        packed_leaves = []
+        terminal_leaf_nodes = []
+        for _ in range(simulation.getBatchSize()):
+            if search_statistics is not None:
+                time_start = perf_counter()
+            leaf_node = treePolicy(node_pool, init_node, chessboard, history, transposition_table, is_widening, \
+                                   search_statistics)
+            if search_statistics is not None:
+                search_statistics.addPhaseTime('treePolicy', perf_counter() - time_start)
+                # Playouts run in the worker processes, so their length is not known.
+                search_statistics.addIteration(len(history))
+            if node_pool.checkTerminal(leaf_node):
+                propagateProof(node_pool, leaf_node)
+                terminal_leaf_nodes.append(leaf_node)
+            else:
+                leaf_nodes.append(leaf_node)
+                packed_leaves.append(packLeaf(chessboard, node_pool.getState(leaf_node)))
+            addVirtualLoss(node_pool, leaf_node)
+            
+            # Restore the root position.
+            while history:
+                chessboard.unmakeMovement(history.pop())
+        
+        if search_statistics is not None:
+            time_start = perf_counter()
+        rewards = simulation.simulateLeaves(packed_leaves)
+        if search_statistics is not None:
+            time_default_policy = perf_counter()
+            search_statistics.addPhaseTime('defaultPolicy', time_default_policy - time_start, len(packed_leaves))
+        for leaf_node, reward in zip(leaf_nodes, rewards):
+            removeVirtualLoss(node_pool, leaf_node)
+            backPropagation(node_pool, leaf_node, reward, transposition_table)
+        for leaf_node in terminal_leaf_nodes:
+            removeVirtualLoss(node_pool, leaf_node)
+            backPropagation(node_pool, leaf_node, node_pool.computeReward(leaf_node), transposition_table)
+        if search_statistics is not None:
+            search_statistics.addPhaseTime('backPropagation', perf_counter() - time_default_policy, \
+                                           len(leaf_nodes) + len(terminal_leaf_nodes))
+        iterations += len(leaf_nodes) + len(terminal_leaf_nodes)
+        
+        if progress_callback is not None:
+            elapsed_time = time_manager.getElapsedTime()
+            if elapsed_time >= next_progress_time:
+                progress_callback(iterations, elapsed_time, node_pool, init_node)
+                next_progress_time = elapsed_time + PROGRESS_INTERVAL
+    
+    if search_statistics is not None:
+        search_statistics.setElapsedTime(time_manager.getElapsedTime())
+        search_statistics.collectTreeStatistics(node_pool, init_node)
+    return iterations
+
+def addVirtualLoss(node_pool, node):
+    """
+    Add a virtual loss to `node` and its ancestors.
+    """
+    while node != NodePool.NULL_NODE:
+        # Rewards are from the view of white chess.
+        if node_pool.getCurrentTurn(node) == State.WHITE:
+            virtual_reward = -VIRTUAL_LOSS
         else:
-            return expandNode(node)
-    return node
+            virtual_reward = VIRTUAL_LOSS
+        node_pool.setVisitedTimes(node, node_pool.getVisitedTimes(node) + VIRTUAL_LOSS)
+        node_pool.setQualityValue(node, node_pool.getQualityValue(node) + virtual_reward)
+        node_pool.setVirtualLoss(node, node_pool.getVirtualLoss(node) + 1)
+        node = node_pool.getParentNode(node)
+
+def removeVirtualLoss(node_pool, node):
+    """
+    Remove a virtual loss added by `addVirtualLoss`.
+    """
+    while node != NodePool.NULL_NODE:
+        if node_pool.getCurrentTurn(node) == State.WHITE:
+            virtual_reward = -VIRTUAL_LOSS
+        else:
+            virtual_reward = VIRTUAL_LOSS
+        node_pool.setVisitedTimes(node, node_pool.getVisitedTimes(node) - VIRTUAL_LOSS)
+        node_pool.setQualityValue(node, node_pool.getQualityValue(node) - virtual_reward)
+        node_pool.setVirtualLoss(node, node_pool.getVirtualLoss(node) - 1)
+        node = node_pool.getParentNode(node)
+
+def searchRootParallel(chessboard, worker_num, time_limit=None, node_limit=None, pool=None, default_policy=None, \
+                       chess=State.WHITE):
+    """
+    Root-parallel MCTS. `worker_num` processes (of `pool`, or of a new pool)
+    search independent trees from the same root, `chess` to move, with
+    different random seeds and the same budget. Each tree has its own
+    transposition table, and plays `default_policy` (see `searchTree`),
+    which must be picklable. Return the merged statistics of the root
+    children, `{packed movement: [visited times, quality value]}`, and the
+    total number of iterations.
+    """
+    base_seed = getrandbits(32)
+    black_bitboard = chessboard.getBitboard(State.BLACK)
+    white_bitboard = chessboard.getBitboard(State.WHITE)
+    tasks = [(black_bitboard, white_bitboard, chess, base_seed + i, time_limit, node_limit, default_policy) \
+             for i in range(worker_num)]
+    if pool is None:
+        # Single-process searches do not pay for importing multiprocessing.
+        from multiprocessing import Pool
+        with Pool(worker_num) as new_pool:
+            results = new_pool.map(_searchRootWorker, tasks)
+    else:
+        results = pool.map(_searchRootWorker, tasks)
+    
+    root_statistics = {}
+    total_iterations = 0
+    for iterations, children_statistics in results:
+        total_iterations += iterations
+        for movement, visited_times, quality_value in children_statistics:
+            statistics = root_statistics.setdefault(movement, [0, 0])
+            statistics[0] += visited_times
+            statistics[1] += quality_value
+    
+    return root_statistics, total_iterations
+
+def _searchRootWorker(task):
+    """
+    Search one tree of `searchRootParallel` in a worker process.
+    """
+    black_bitboard, white_bitboard, chess, random_seed, time_limit, node_limit, default_policy = task
+    seedWorker(default_policy, random_seed)
+    chessboard = Chessboard()
+    chessboard.setBitboards(black_bitboard, white_bitboard)
+    
+    # The current turn of a node is the side which has just moved.
+    if chess == State.WHITE:
+        turn = State.BLACK
+    else:
+        turn = State.WHITE
+    node_pool = NodePool()
+    init_node = node_pool.addNode(NodePool.NULL_NODE, 0, chessboard.getHashKey(chess), turn, 0)
+    pruneRootMovements(node_pool, init_node, chessboard)
+    iterations = searchTree(node_pool, init_node, chessboard, TimeManager(time_limit, node_limit), \
+                            TranspositionTable(), default_policy=default_policy)
+    
+    return iterations, [(node_pool.getMovement(child_node), node_pool.getVisitedTimes(child_node), \
+                         node_pool.getQualityValue(child_node)) \
+                        for child_node in node_pool.getChildrenNodes(init_node)]
     
-def defaultPolicy(node):
+def pruneRootMovements(node_pool, node, chessboard):
+    """
+    Tactical pre-check of a root, whose position is `chessboard`. If the
+    opponent could win at once after some movements but not after others,
+    those movements are dropped from the untried movements and their
+    children are marked as proven losses, so the search only spends
+    iterations on the safe movements.
+    """
+    chess = node_pool.getState(node).getNextTurn()
+    available_movement = getAllAvailableMovement(chess, chessboard)
+    safe_movements = getSafeMovements(chess, chessboard, available_movement)
+    if len(safe_movements) == 0 or len(safe_movements) == len(available_movement):
+        return
+    
+    unsafe_movements = set(available_movement).difference(safe_movements)
+    untried_movements = node_pool.getUntriedMovements(node)
+    if untried_movements is None:
+        untried_movements = safe_movements
+        shuffle(untried_movements)
+        node_pool.setUntriedMovements(node, untried_movements)
+    else:
+        node_pool.setUntriedMovements(node, [movement for movement in untried_movements \
+                                             if movement not in unsafe_movements])
+    
+    # The proof of a win for the opponent.
+    if chess == State.WHITE:
+        enemy_proof = -1
+    else:
+        enemy_proof = 1
+    for child_node in node_pool.getChildrenNodes(node):
+        if node_pool.getMovement(child_node) in unsafe_movements:
+            node_pool.setProof(child_node, enemy_proof)
+    
+def treePolicy(node_pool, node, chessboard, history, transposition_table=None, is_widening=False, \
+               search_statistics=None):
+    """
+    Tree policy (Selection and expansion steps). A node is expanded while it
+    has untried movements; with `is_widening` (progressive widening), only
+    while it has fewer children than `WIDENING_CONST * n ** WIDENING_EXPONENT`
+    for n visits, so the selection deepens the tree sooner. Proven nodes are
+    leaves.
+    """
+    while not node_pool.checkTerminal(node):
+        if checkExpandable(node_pool, node, is_widening):
+            break
+        best_child_node = findBestChild(node_pool, node, True, transposition_table)
+        # Every child is a proven loss, but movements are left to try.
+        if best_child_node == NodePool.NULL_NODE:
+            break
+        node = best_child_node
+        history.append(chessboard.makeMovement(node_pool.getMovement(node)))
+    else:
+        return node
+    
+    # No room for a new node, so the playout starts from this node.
+    if node_pool.checkFull():
+        return node
+    if search_statistics is None:
+        return expandNode(node_pool, node, chessboard, history)
+    time_start = perf_counter()
+    expanded_node = expandNode(node_pool, node, chessboard, history)
+    search_statistics.addPhaseTime('expandNode', perf_counter() - time_start)
+    return expanded_node
+
+def checkExpandable(node_pool, node, is_widening=False):
+    """
+    Check if a node should get a new child node before selection goes on.
+    """
+    untried_movements = node_pool.getUntriedMovements(node)
+    if untried_movements is None:
+        return True
+    if len(untried_movements) == 0:
+        return False
+    if not is_widening:
+        return True
+    children_limit = WIDENING_CONST * node_pool.getVisitedTimes(node) ** WIDENING_EXPONENT
+    return node_pool.getChildrenNum(node) < max(1, children_limit)
+    
+def defaultPolicy(state, chessboard, history):
     """
     Default policy (Simulation step).
     """
-    current_state = node.getState()
+    # The playout advances a copy of the state in place on the scratch chessboard.
+    current_state = state.copyState()
     
     children_nodes_num = 1
     while not current_state.checkTerminal():
         children_nodes_num += 1
-        tmp = current_state.getNextState()
-        if tmp is None:
+        if not current_state.makeRandomMovement(chessboard, history):
             break
-        else:
-            current_state = tmp
             
     reward = current_state.computeReward() / children_nodes_num
     
     return reward
     
-def expandNode(node):
+def expandNode(node_pool, node, chessboard, history):
     """
-    Expand nodes.
+    Expand nodes. Each legal movement of a node is expanded once, in random
+    order, except that a movement which wins at once is expanded first (and
+    proves the node won). Return the new child node, or `node` itself if it
+    is terminal or the pool is full.
     """
-    tried_children_nodes_states = [child_node.getState() for child_node in node.getChildrenNodes()]
-
-    new_state = node.getState().getNextState()
-    
-    while new_state in tried_children_nodes_states:
-        new_state = node.getState().getNextState()
+    state = node_pool.getState(node)
+    untried_movements = node_pool.getUntriedMovements(node)
+    if untried_movements is None:
+        untried_movements = getAllAvailableMovement(state.getNextTurn(), chessboard)
+        shuffle(untried_movements)
+        winning_movement = findWinningMovement(state.getNextTurn(), chessboard, untried_movements)
+        if winning_movement is not None:
+            # The last movement is expanded first.
+            untried_movements.remove(winning_movement)
+            untried_movements.append(winning_movement)
+        node_pool.setUntriedMovements(node, untried_movements)
+    # The side to move has no legal movement, so this node is terminal.
+    if len(untried_movements) == 0:
+        node_pool.setEndState(node, NodeState.STALEMATE)
+        return node
+    # The untried movements may have filled the pool, so the playout starts
+    # from this node; `addState` cannot fail after this check.
+    if node_pool.checkFull():
+        return node
     
-    child_node = TreeNode(new_state)
-    node.addChild(child_node)
+    new_state = state.getNextState(chessboard, history, node_pool.popUntriedMovement(node))
+    return node_pool.addState(node, new_state)
     
-    return child_node
+def propagateProof(node_pool, node):
+    """
+    Propagate the proof of a proven node to its ancestors (MCTS-Solver). A
+    node is won by the side to move if one of its children is won by it,
+    and lost if every legal movement leads to a child won by the other side.
+    """
+    proof = node_pool.getProof(node)
+    while proof != 0:
+        parent_node = node_pool.getParentNode(node)
+        if parent_node == NodePool.NULL_NODE or node_pool.getProof(parent_node) != 0:
+            return
+        # The proof of a win for the side which moved to `node`.
+        if node_pool.getCurrentTurn(node) == State.WHITE:
+            mover_proof = 1
+        else:
+            mover_proof = -1
+        
+        if proof == mover_proof:
+            node_pool.setProof(parent_node, mover_proof)
+        elif node_pool.checkFullyExpanded(parent_node) and \
+             all(node_pool.getProof(child_node) == -mover_proof \
+                 for child_node in node_pool.getChildrenNodes(parent_node)):
+            node_pool.setProof(parent_node, -mover_proof)
+        else:
+            return
+        node = parent_node
+        proof = node_pool.getProof(node)
     
-def backPropagation(node, reward):
+def backPropagation(node_pool, node, reward, transposition_table=None):
     """
     Backpropagation step.
     """
-    while node is not None:
-        node.setVisitedTimes(node.getVisitedTimes() + 1)
-        node.setQualityValue(node.getQualityValue() + reward)
-        node = node.getParentNode()
+    while node != NodePool.NULL_NODE:
+        node_pool.setVisitedTimes(node, node_pool.getVisitedTimes(node) + 1)
+        node_pool.setQualityValue(node, node_pool.getQualityValue(node) + reward)
+        if transposition_table is not None:
+            transposition_table.update(node_pool.getHashKey(node), reward)
+        node = node_pool.getParentNode(node)
     
-def findBestChild(node, is_exploration):
+def findBestChild(node_pool, node, is_exploration, transposition_table=None):
     """
-    Find the best children node by Upper Confident Bound (UCB) algorithm.
+    Find the best children node by Upper Confident Bound (UCB) algorithm. If
+    a child position has been visited more often through transpositions, its
+    mean value is taken from `transposition_table`, unless the child has
+    leaves in flight: the table has no virtual losses, and the batch would
+    pile onto one path without them. Rewards are from the view of white
+    chess, so the values of black movements are negated. Children proven
+    lost for the side to move are skipped; return `NULL_NODE` if every child
+    is.
     """
+    if is_exploration:
+        const_c = 1 / sqrt(2)
+    else:
+        const_c = 0
+    log_visited_times = 2 * log(node_pool.getVisitedTimes(node))
+    
     best_score = -maxsize
-    best_child_node = None
-    for child_node in node.getChildrenNodes():
-        if is_exploration:
-            const_c = 1 / sqrt(2)
-        else:
-            const_c = 0
+    best_child_node = NodePool.NULL_NODE
+    child_node = node_pool.getFirstChildNode(node)
+    while child_node != NodePool.NULL_NODE:
+        if node_pool.getProof(child_node) != 0:
+            child_node = node_pool.getSiblingNode(child_node)
+            continue
+        visited_times = node_pool.getVisitedTimes(child_node)
+        mean_value = node_pool.getQualityValue(child_node) / visited_times
+        if transposition_table is not None and node_pool.getVirtualLoss(child_node) == 0:
+            slot = transposition_table.findEntry(node_pool.getHashKey(child_node))
+            if slot != -1 and transposition_table.getVisitedTimes(slot) > visited_times:
+                mean_value = transposition_table.getQualityValue(slot) / transposition_table.getVisitedTimes(slot)
+        if node_pool.getCurrentTurn(child_node) == State.BLACK:
+            mean_value = -mean_value
         
-        score = child_node.getQualityValue() / child_node.getVisitedTimes() + \
-        const_c * sqrt(2 * log(node.getVisitedTimes()) / child_node.getVisitedTimes())
+        score = mean_value + const_c * sqrt(log_visited_times / visited_times)
         
         if score > best_score:
             best_score = score
             best_child_node = child_node
+        child_node = node_pool.getSiblingNode(child_node)
 
     return best_child_node
+
+def findMostVisitedChild(node_pool, node):
+    """
+    Find the most visited children node, which is the movement to play, or
+    `NULL_NODE` if there is none. Ties are broken by the mean value from the
+    view of the side to move. A child proven won for the side to move comes
+    first, and children proven lost come last.
+    """
+    best_child_node = NodePool.NULL_NODE
+    best_key = None
+    for child_node in node_pool.getChildrenNodes(node):
+        mean_value = node_pool.getQualityValue(child_node) / node_pool.getVisitedTimes(child_node)
+        proof = node_pool.getProof(child_node)
+        if node_pool.getCurrentTurn(child_node) == State.BLACK:
+            mean_value = -mean_value
+            proof = -proof
+        key = (proof, node_pool.getVisitedTimes(child_node), mean_value)
+        if best_key is None or key > best_key:
+            best_key = key
+            best_child_node = child_node
+
+    return best_child_node
+
+def findMostVisitedMovement(root_statistics, chess=State.WHITE):
+    """
+    Find the most visited movement of merged root statistics (see
+    `searchRootParallel`) for `chess`; ties go to the better mean value.
+    Return it as `[[row, column], [row, column]]`, or None if there is no
+    movement.
+    """
+    # Rewards are from the view of white chess.
+    if chess == State.WHITE:
+        sign = 1
+    else:
+        sign = -1
+    best_movement = None
+    best_key = None
+    for movement, (visited_times, quality_value) in root_statistics.items():
+        key = (visited_times, sign * quality_value / visited_times)
+        if best_key is None or key > best_key:
+            best_key = key
+            best_movement = movement
+    
+    if best_movement is None:
+        return None
+    return NodeState(best_movement).getBestMovement()
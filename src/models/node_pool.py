@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from sys import getsizeof
+from .node_state import NodeState
+
+class NodePool(object):
+    """ Class
+    Describe the nodes of a Monte Carlo tree as preallocated arrays indexed
+    by integer node ids (struct of arrays), so the tree holds millions of
+    nodes within `memory_limit` bytes and a UCB scan reads flat arrays
+    instead of chasing node objects.
+
+    The children of a node form a linked list: `getFirstChildNode` and then
+    `getSiblingNode` until `NULL_NODE`. A node also holds its legal
+    movements not expanded yet (packed in an `array`), which are None until
+    the node is first expanded and `NO_MOVEMENTS` once all are expanded, and
+    its proof for MCTS-Solver: 1 if the position is proven won by white
+    chess, -1 if proven won by black chess, 0 if unknown. Nodes are only
+    added; `keepSubtree` compacts the pool to the subtree of a new root.
+
+    The arrays start with `INITIAL_SIZE` nodes and double as nodes are
+    added, up to the capacity, so a short search does not pay for the whole
+    of `memory_limit`. The untried movements count against `memory_limit`
+    too, so the pool is full once nodes and untried movements reach it.
+    """
+    MEMORY_LIMIT = 64 * 1024 * 1024
+    INITIAL_SIZE = 4096
+    NULL_NODE = -1
+    NO_MOVEMENTS = ()
+    # Bytes per node: visited times, quality value, movement, first child,
+    # sibling, parent, children number, hash key, turn, round, end state,
+    # proof, virtual losses, the reference to the untried movements and their
+    # number.
+    NODE_SIZE = 4 + 8 + 2 + 4 + 4 + 4 + 2 + 8 + 1 + 2 + 1 + 1 + 2 + 8 + 1
+    # Bytes of the untried movements of a node are this plus 2 per movement.
+    UNTRIED_HEADER_SIZE = getsizeof(array('H'))
+
+    def __init__(self, memory_limit=MEMORY_LIMIT):
+        capacity = max(1, memory_limit // NodePool.NODE_SIZE)
+        self._capacity = capacity
+        self._memory_limit = memory_limit
+        size = min(capacity, NodePool.INITIAL_SIZE)
+        self._size = size
+        self._visited_times = array('i', [0]) * size
+        self._quality_values = array('d', [0]) * size
+        self._movements = array('H', [0]) * size
+        self._first_children = array('i', [NodePool.NULL_NODE]) * size
+        self._siblings = array('i', [NodePool.NULL_NODE]) * size
+        self._parents = array('i', [NodePool.NULL_NODE]) * size
+        self._children_nums = array('H', [0]) * size
+        self._hash_keys = array('Q', [0]) * size
+        self._turns = array('B', [0]) * size
+        self._rounds = array('H', [0]) * size
+        self._end_states = array('B', [0]) * size
+        self._proofs = array('b', [0]) * size
+        self._virtual_losses = array('H', [0]) * size
+        self._untried_movements = [None] * size
+        # Movement numbers charged for the untried movements of each node.
+        self._untried_nums = array('B', [0]) * size
+        self._untried_size = 0
+        self._node_num = 0
+
+    def getCapacity(self):
+        """
+        Return the largest number of nodes of this pool.
+        """
+        return self._capacity
+
+    def getNodeNum(self):
+        """
+        Return the number of nodes in this pool.
+        """
+        return self._node_num
+
+    def getMemorySize(self):
+        """
+        Return the bytes used by the nodes and their untried movements.
+        """
+        return self._node_num * NodePool.NODE_SIZE + self._untried_size
+
+    def checkFull(self):
+        """
+        Check if no more node can be added.
+        """
+        return self._node_num == self._capacity or \
+               self._node_num * NodePool.NODE_SIZE + self._untried_size >= self._memory_limit
+
+    def clear(self):
+        """
+        Remove all nodes. The arrays are kept; `addNode` sets every field of a
+        new node. The untried movements are dropped so they can be freed.
+        """
+        self._untried_movements[:self._node_num] = [None] * self._node_num
+        self._untried_size = 0
+        self._node_num = 0
+
+    def addNode(self, parent_node, movement, hash_key, turn, current_round):
+        """
+        Add a node reached from `parent_node` (`NULL_NODE` for a root) by a
+        packed movement. Return its id, or `NULL_NODE` if this pool is full.
+        """
+        node = self._node_num
+        if node * NodePool.NODE_SIZE + self._untried_size >= self._memory_limit:
+            return NodePool.NULL_NODE
+        if node == self._size:
+            if node == self._capacity:
+                return NodePool.NULL_NODE
+            self._growArrays()
+        self._node_num += 1
+
+        self._visited_times[node] = 0
+        self._quality_values[node] = 0
+        self._movements[node] = movement
+        self._first_children[node] = NodePool.NULL_NODE
+        self._children_nums[node] = 0
+        self._hash_keys[node] = hash_key
+        self._turns[node] = turn
+        self._rounds[node] = current_round
+        self._end_states[node] = 0
+        self._proofs[node] = 0
+        self._virtual_losses[node] = 0
+        self._untried_movements[node] = None
+        self._untried_nums[node] = 0
+        self._parents[node] = parent_node
+        if parent_node != NodePool.NULL_NODE:
+            self._siblings[node] = self._first_children[parent_node]
+            self._first_children[parent_node] = node
+            self._children_nums[parent_node] += 1
+        else:
+            self._siblings[node] = NodePool.NULL_NODE
+        return node
+
+    def _growArrays(self):
+        """
+        Double the size of the arrays, up to the capacity and to the memory
+        left by the untried movements. `addNode` sets every field of a new
+        node, so the new entries are not initialized.
+        """
+        room = (self._memory_limit - self._untried_size) // NodePool.NODE_SIZE - self._size
+        extra_size = max(1, min(self._size, self._capacity - self._size, room))
+        for values in [self._visited_times, self._quality_values, self._movements, self._first_children, \
+                       self._siblings, self._parents, self._children_nums, self._hash_keys, self._turns, \
+                       self._rounds, self._end_states, self._proofs, self._virtual_losses, self._untried_nums]:
+            values.extend(array(values.typecode, [0]) * extra_size)
+        self._untried_movements.extend([None] * extra_size)
+        self._size += extra_size
+
+    def addState(self, parent_node, state):
+        """
+        Add a node of a `NodeState`. Return its id, or `NULL_NODE` if this pool
+        is full.
+        """
+        node = self.addNode(parent_node, state.getMovement() or 0, state.getHashKey(), \
+                            state.getCurrentTurn(), state.getCurrentRound())
+        if node != NodePool.NULL_NODE:
+            self._end_states[node] = state.getEndState()
+            # A won game is proven; a draw is not.
+            self._proofs[node] = state.computeReward()
+        return node
+
+    def getState(self, node):
+        """
+        Return a new `NodeState` of a node.
+        """
+        state = NodeState(self._movements[node])
+        state.setHashKey(self._hash_keys[node])
+        state.setCurrentTurn(self._turns[node])
+        state.setCurrentRound(self._rounds[node])
+        state.setEndState(self._end_states[node])
+        return state
+
+    def getVisitedTimes(self, node):
+        """
+        Return the visited times of a node.
+        """
+        return self._visited_times[node]
+
+    def getQualityValue(self, node):
+        """
+        Return the quality value of a node.
+        """
+        return self._quality_values[node]
+
+    def getMovement(self, node):
+        """
+        Return the packed movement leading to a node.
+        """
+        return self._movements[node]
+
+    def getBestMovement(self, node):
+        """
+        Return the movement leading to a node as `[[row, column], [row, column]]`.
+        """
+        return NodeState(self._movements[node]).getBestMovement()
+
+    def getParentNode(self, node):
+        """
+        Return the parent node of a node, or `NULL_NODE`.
+        """
+        return self._parents[node]
+
+    def getFirstChildNode(self, node):
+        """
+        Return the first child node of a node, or `NULL_NODE`.
+        """
+        return self._first_children[node]
+
+    def getSiblingNode(self, node):
+        """
+        Return the next sibling node of a node, or `NULL_NODE`.
+        """
+        return self._siblings[node]
+
+    def getChildrenNodes(self, node):
+        """
+        Return the children nodes of a node.
+        """
+        children_nodes = []
+        siblings = self._siblings
+        child_node = self._first_children[node]
+        while child_node != NodePool.NULL_NODE:
+            children_nodes.append(child_node)
+            child_node = siblings[child_node]
+        return children_nodes
+
+    def getChildrenNum(self, node):
+        """
+        Return the number of children nodes of a node.
+        """
+        return self._children_nums[node]
+
+    def getHashKey(self, node):
+        """
+        Return the hash key of the position of a node.
+        """
+        return self._hash_keys[node]
+
+    def getCurrentTurn(self, node):
+        """
+        Return the side which has just moved at a node.
+        """
+        return self._turns[node]
+
+    def getCurrentRound(self, node):
+        """
+        Return the current round of a node.
+        """
+        return self._rounds[node]
+
+    def getEndState(self, node):
+        """
+        Return the end state of a node (see `NodeState.getEndState`).
+        """
+        return self._end_states[node]
+
+    def getUntriedMovements(self, node):
+        """
+        Return the packed legal movements of a node which have no child node
+        yet, or None if they have not been generated. They are changed only
+        by `setUntriedMovements` and `popUntriedMovement`.
+        """
+        return self._untried_movements[node]
+
+    def getProof(self, node):
+        """
+        Return the proof of a node: 1 (white chess wins), -1 (black chess
+        wins) or 0 (unknown).
+        """
+        return self._proofs[node]
+
+    def getVirtualLoss(self, node):
+        """
+        Return the number of virtual losses of a node, which is the number of
+        leaves in flight below it in leaf-parallel MCTS.
+        """
+        return self._virtual_losses[node]
+
+    def setVisitedTimes(self, node, visited_times):
+        """
+        Setup the visited times of a node.
+        """
+        self._visited_times[node] = visited_times
+
+    def setQualityValue(self, node, quality_value):
+        """
+        Setup the quality value of a node.
+        """
+        self._quality_values[node] = quality_value
+
+    def setEndState(self, node, end_state):
+        """
+        Setup the end state of a node.
+        """
+        self._end_states[node] = end_state
+
+    def setProof(self, node, proof):
+        """
+        Setup the proof of a node.
+        """
+        self._proofs[node] = proof
+
+    def setVirtualLoss(self, node, virtual_loss):
+        """
+        Setup the number of virtual losses of a node.
+        """
+        self._virtual_losses[node] = virtual_loss
+
+    def setUntriedMovements(self, node, untried_movements):
+        """
+        Setup the untried movements of a node from a list of packed movements.
+        The last movement is popped first.
+        """
+        self._releaseUntriedMovements(node)
+        if len(untried_movements) == 0:
+            self._untried_movements[node] = NodePool.NO_MOVEMENTS
+            return
+        self._untried_movements[node] = array('H', untried_movements)
+        self._untried_nums[node] = len(untried_movements)
+        self._untried_size += NodePool.UNTRIED_HEADER_SIZE + 2 * len(untried_movements)
+
+    def popUntriedMovement(self, node):
+        """
+        Remove and return the last untried movement of a node, which must have
+        one.
+        """
+        untried_movements = self._untried_movements[node]
+        movement = untried_movements.pop()
+        if len(untried_movements) == 0:
+            self._releaseUntriedMovements(node)
+            self._untried_movements[node] = NodePool.NO_MOVEMENTS
+        return movement
+
+    def _releaseUntriedMovements(self, node):
+        """
+        Stop counting the untried movements of a node against the memory
+        limit.
+        """
+        untried_num = self._untried_nums[node]
+        if untried_num != 0:
+            self._untried_size -= NodePool.UNTRIED_HEADER_SIZE + 2 * untried_num
+            self._untried_nums[node] = 0
+
+    def checkTerminal(self, node):
+        """
+        Check if a node is a leaf node. A proven node is a leaf, since its
+        result is known.
+        """
+        return self._end_states[node] != 0 or self._proofs[node] != 0 or \
+               self._rounds[node] == NodeState.MAX_ROUND
+
+    def checkFullyExpanded(self, node):
+        """
+        Check if every legal movement of a node has a child node.
+        """
+        untried_movements = self._untried_movements[node]
+        return untried_movements is not None and len(untried_movements) == 0
+
+    def computeReward(self, node):
+        """
+        Compute the reward of a leaf node: its proof if it is proven, or the
+        reward of its state (see `NodeState.computeReward`).
+        """
+        proof = self._proofs[node]
+        if proof != 0:
+            return proof
+        return self.getState(node).computeReward()
+
+    def keepSubtree(self, node):
+        """
+        Drop every node outside the subtree of `node` and make `node` the root,
+        with its rounds counted from 0. The kept nodes are moved to the front
+        of this pool; return the new id of `node`, which is 0.
+        """
+        # Old ids in breadth-first order; the new id of a node is its index.
+        order = [node]
+        for old_node in order:
+            order.extend(self.getChildrenNodes(old_node))
+        new_ids = {}
+        for new_node, old_node in enumerate(order):
+            new_ids[old_node] = new_node
+
+        node_num = len(order)
+        base_round = self._rounds[node]
+        for values in [self._visited_times, self._quality_values, self._movements, \
+                       self._children_nums, self._hash_keys, self._turns, self._end_states, \
+                       self._proofs, self._virtual_losses, self._untried_nums]:
+            values[:node_num] = array(values.typecode, [values[old_node] for old_node in order])
+        self._untried_movements[:node_num] = [self._untried_movements[old_node] for old_node in order]
+        # Drop the untried movements of the other nodes so they can be freed.
+        self._untried_movements[node_num:self._node_num] = [None] * (self._node_num - node_num)
+        self._untried_size = sum(NodePool.UNTRIED_HEADER_SIZE + 2 * untried_num \
+                                 for untried_num in self._untried_nums[:node_num] if untried_num != 0)
+        for values in [self._first_children, self._siblings, self._parents]:
+            values[:node_num] = array(values.typecode, [new_ids.get(values[old_node], NodePool.NULL_NODE) \
+                                                            for old_node in order])
+        self._rounds[:node_num] = array('H', [self._rounds[old_node] - base_round for old_node in order])
+        self._node_num = node_num
+        return 0
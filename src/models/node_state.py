@@ -1,31 +1,37 @@
 # -*- coding: utf-8 -*-
 
-from copy import deepcopy
-from numpy import zeros
 from random import choice
-from src.models.chessboard import State
-from src.models.eight_connectivity_two_pass import eightConnectivityTwoPass
-from src.models.get_available_movement import getAvailableMovement as getMovement
+from .bitboard import unpackMovement
+from .chessboard import State
+from .get_available_movement import getAllAvailableMovement
 
 class NodeState(object):
     """ Class
-    Describe the state of a node.
+    Describe the state of a node. A state only keeps the packed movement
+    leading to it; the chessboard is a scratch position owned by the search,
+    on which the movements are made and taken back in place.
     """
     MAX_ROUND = 200
+    STALEMATE = 3
     
-    def __init__(self, chessboard):
-        self._chessboard = deepcopy(chessboard)
+    def __init__(self, movement=None):
+        self._movement = movement
+        self._hash_key = 0
         self._current_round = 0
         self._current_turn = 0
-        self._best_movement = []
-        self._available_movement = []
         self._is_end = 0
         
-    def getChessboard(self):
+    def getMovement(self):
         """
-        Return the chessboard of this state.
+        Return the packed movement leading to this state.
         """
-        return self._chessboard
+        return self._movement
+    
+    def getHashKey(self):
+        """
+        Return the hash key of the position of this state.
+        """
+        return self._hash_key
     
     def getCurrentRound(self):
         """
@@ -39,23 +45,31 @@ class NodeState(object):
         """
         return self._current_turn
     
-    def getBestMovement(self):
+    def getEndState(self):
         """
-        Return the best movement of this state.
+        Return the end state of this state: 0 if the game goes on, 1 if white
+        chess won, 2 if black chess won, or `STALEMATE`.
         """
-        return self._best_movement
-   
-    def getAvailableMovement(self):
+        return self._is_end
+    
+    def getBestMovement(self):
         """
-        Setup the legal movements of this state.
+        Return the best movement of this state as `[[row, column], [row, column]]`.
         """
-        return self._available_movement
+        from_square, to_square = unpackMovement(self._movement)
+        return [[from_square >> 3, from_square & 7], [to_square >> 3, to_square & 7]]
     
-    def setChessboard(self, chessboard):
+    def setMovement(self, movement):
+        """
+        Setup the packed movement leading to this state.
+        """
+        self._movement = movement
+        
+    def setHashKey(self, hash_key):
         """
-        Setup the chessboard of this state.
+        Setup the hash key of the position of this state.
         """
-        self._chessboard = deepcopy(chessboard)
+        self._hash_key = hash_key
         
     def setCurrentRound(self, current_round):
         """
@@ -69,30 +83,22 @@ class NodeState(object):
         """
         self._current_turn = turn
         
-    def setBestMovement(self, from_movement, to_movement):
-        """
-        Setup the best movement of this state.
-        """
-        self._best_movement.append(from_movement)
-        self._best_movement.append(to_movement)
-        
-    def setAvailableMovement(self, available_movement):
+    def setEndState(self, end_state):
         """
-        Setup the legal movements of this state.
+        Setup the end state of this state.
         """
-        self._available_movement = available_movement
+        self._is_end = end_state
         
-    def getChessPosition(self, chess):
+    def copyState(self):
         """
-        Return positions of a kind of chess.
+        Return a copy of this state.
         """
-        return [[i, j] for i in range(8) for j in range(8) if self._chessboard[i][j] == chess]
-    
-    def setChess(self, pos_x, pos_y, chess):
-        """
-        Setup the value of a specified position.
-        """
-        self._chessboard[pos_x][pos_y] = chess
+        state = NodeState(self._movement)
+        state._hash_key = self._hash_key
+        state._current_round = self._current_round
+        state._current_turn = self._current_turn
+        state._is_end = self._is_end
+        return state
         
     def checkTerminal(self):
         """
@@ -116,76 +122,68 @@ class NodeState(object):
         else:
             return 0
     
-    def getNextState(self):
+    def getNextState(self, chessboard, history, movement):
+        """
+        Return the next state of this state by a packed movement of the other
+        player. `chessboard` is the position of this state; the movement is
+        made on it in place and its undo record is appended to `history`.
+        """
+        next_state = NodeState()
+        next_state.setCurrentTurn(self._current_turn)
+        next_state.setCurrentRound(self._current_round)
+        next_state.makeMovement(chessboard, history, movement)
+        # After the movement, the side to move is the current turn of this state.
+        next_state.setHashKey(chessboard.getHashKey(self._current_turn))
+        
+        return next_state
+    
+    def getNextTurn(self):
         """
-        Return the next state of this state.
+        Return the side to move in this state.
         """
-        next_state = NodeState(self.getChessboard())
-        
-        # Change to the other player.
-        if self.getCurrentTurn() == State.BLACK:
-            next_state.setCurrentTurn(State.WHITE)
+        if self._current_turn == State.BLACK:
+            return State.WHITE
         else:
-            next_state.setCurrentTurn(State.BLACK)
-
-        available_choices = next_state.getChessPosition(next_state.getCurrentTurn())
-        if len(available_choices) == 0:
-            self._is_end = next_state.getCurrentTurn()
-            return None
-        from_movement = choice([choice for choice in available_choices])
-
-        while True:
-            available_movement = getMovement(from_movement[1], from_movement[0], \
-                                             next_state.getCurrentTurn(), next_state.getChessboard())
-            if len(available_movement) != 0:
-                next_state.setAvailableMovement([[x[1], x[0]] for x in available_movement])
-                break
-            else:
-                from_movement = choice([choice for choice in available_choices])
-                
-        to_movement = choice([choice for choice in next_state.getAvailableMovement()])
-        next_state.setBestMovement(from_movement, to_movement)
-        next_state.setChess(from_movement[0], from_movement[1], State.EMPTY)
-        next_state.setChess(to_movement[0], to_movement[1], next_state.getCurrentTurn())
-        next_state.setCurrentRound(self.getCurrentRound() + 1)
+            return State.BLACK
+    
+    def makeRandomMovement(self, chessboard, history):
+        """
+        Advance this state in place by a random legal movement of the other
+        player. Return False, and mark a stalemate (draw), if there is none.
+        """
+        available_movement = getAllAvailableMovement(self.getNextTurn(), chessboard)
+        if len(available_movement) == 0:
+            self._is_end = NodeState.STALEMATE
+            return False
         
-        next_state.checkGameEnd()
+        self.makeMovement(chessboard, history, choice(available_movement))
         
-        return next_state
+        return True
+    
+    def makeMovement(self, chessboard, history, movement):
+        """
+        Advance this state in place by a packed movement of the other player.
+        """
+        # Change to the other player.
+        self._current_turn = self.getNextTurn()
+        self._movement = movement
+        self._current_round += 1
+        undo_record = chessboard.makeMovement(movement)
+        history.append(undo_record)
+        
+        self.checkGameEnd(chessboard, undo_record)
     
-    def checkGameEnd(self):
+    def checkGameEnd(self, chessboard, undo_record=None):
         """
         Check if this game ends in this state.
         """
+        winner = chessboard.getWinner(self._current_turn, undo_record)
         # White chess won.
-        if len(self.getChessPosition(State.BLACK)) <= 1:
+        if winner == State.WHITE:
             self._is_end = 1
         # Black chess won.
-        elif len(self.getChessPosition(State.WHITE)) <= 1:
+        elif winner == State.BLACK:
             self._is_end = 2
+        # Keep going.
         else:
-            chessboard = self.getChessboard()
-            chessboard_black = zeros([8, 8], dtype=int)
-            chessboard_white = zeros([8, 8], dtype=int)
-            
-            for i in range(8):
-                for j in range(8):
-                    if chessboard[i][j] == State.BLACK:
-                        chessboard_black[i][j] == 1
-            for i in range(8):
-                for j in range(8):
-                    if chessboard[i][j] == State.WHITE:
-                        chessboard_white[i][j] == 1
-            
-            check_black_win = eightConnectivityTwoPass(chessboard_black)
-            check_white_win = eightConnectivityTwoPass(chessboard_white)
-            
-            # Black chess won.
-            if check_black_win == 1 and check_white_win == 0:
-                self._is_end = 2
-            # White chess won.
-            elif check_white_win == 1 and check_black_win == 0:
-                self._is_end = 1
-            # Keep going.
-            else:
-                self._is_end = 0        
+            self._is_end = 0
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+from mmap import ACCESS_READ, mmap
+from os.path import exists
+from struct import Struct
+from .bitboard import getSquares, packMovement, unpackMovement
+from .chessboard import State
+from .get_available_movement import getAllAvailableMovement
+from .zobrist import ZOBRIST_KEYS, ZOBRIST_WHITE_TURN_KEY
+
+def _buildSymmetrySquares():
+    """
+    Build the square of each square under the eight symmetries of the
+    chessboard (rotations and reflections), and their inverses.
+    """
+    symmetry_squares = []
+    for symmetry in range(8):
+        squares = []
+        for square in range(64):
+            grid_x, grid_y = square & 7, square >> 3
+            if symmetry & 1:
+                grid_x = 7 - grid_x
+            if symmetry & 2:
+                grid_y = 7 - grid_y
+            if symmetry & 4:
+                grid_x, grid_y = grid_y, grid_x
+            squares.append((grid_y << 3) | grid_x)
+        symmetry_squares.append(squares)
+
+    inverse_squares = []
+    for squares in symmetry_squares:
+        inverse = [0] * 64
+        for square, symmetric_square in enumerate(squares):
+            inverse[symmetric_square] = square
+        inverse_squares.append(inverse)
+    return symmetry_squares, inverse_squares
+
+# `SYMMETRY_SQUARES[symmetry][square]`. The rules of the game are the same
+# under every symmetry, so symmetric positions share one book entry.
+SYMMETRY_SQUARES, INVERSE_SYMMETRY_SQUARES = _buildSymmetrySquares()
+
+class OpeningBook(object):
+    """ Class
+    Describe an opening book file, which is memory-mapped and probed by
+    binary search. The file is a header (`HEADER`: magic, version and entry
+    number) followed by entries sorted by key (`ENTRY`: book key, packed
+    movement, visited times and mean value from the view of the side to
+    move). Keys and movements are those of the canonical symmetry of a
+    position (see `getBookKey`).
+    """
+    BOOK_PATH = 'conf/opening_book.bin'
+    MAGIC = b'LOAB'
+    VERSION = 1
+    HEADER = Struct('<4sHI')
+    ENTRY = Struct('<QHIf')
+
+    def __init__(self, path=BOOK_PATH):
+        self._file = open(path, 'rb')
+        self._buffer = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        magic, version, entry_num = OpeningBook.HEADER.unpack_from(self._buffer, 0)
+        if magic != OpeningBook.MAGIC or version != OpeningBook.VERSION:
+            self.close()
+            raise ValueError('{} is not an opening book of version {}.'.format(path, OpeningBook.VERSION))
+        self._entry_num = entry_num
+
+    def getEntryNum(self):
+        """
+        Return the number of entries of this book.
+        """
+        return self._entry_num
+
+    def findEntry(self, book_key):
+        """
+        Return `(packed movement, visited times, mean value)` of a book key in
+        the canonical symmetry, or None if it is not in this book.
+        """
+        low = 0
+        high = self._entry_num
+        while low < high:
+            middle = (low + high) >> 1
+            key, movement, visited_times, mean_value = OpeningBook.ENTRY.unpack_from( \
+                self._buffer, OpeningBook.HEADER.size + middle * OpeningBook.ENTRY.size)
+            if key == book_key:
+                return movement, visited_times, mean_value
+            elif key < book_key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def probeMovement(self, chessboard, chess):
+        """
+        Return the book movement (packed) of `chess` on `chessboard`, or None
+        if the position is not in this book.
+        """
+        book_key, symmetry = getBookKey(chessboard, chess)
+        entry = self.findEntry(book_key)
+        if entry is None:
+            return None
+        movement = transformMovement(entry[0], INVERSE_SYMMETRY_SQUARES[symmetry])
+        # Keys may collide, so the movement is checked.
+        if movement not in getAllAvailableMovement(chess, chessboard):
+            return None
+        return movement
+
+    def close(self):
+        """
+        Unmap and close the book file.
+        """
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def loadBook(path=BOOK_PATH):
+        """
+        Return the opening book of `path`, or None if there is no such file.
+        """
+        if not exists(path):
+            return None
+        return OpeningBook(path)
+
+    @staticmethod
+    def writeBook(path, entries):
+        """
+        Write `{book key: (packed movement, visited times, mean value)}` to an
+        opening book file.
+        """
+        with open(path, 'wb') as book_file:
+            book_file.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.VERSION, len(entries)))
+            for book_key in sorted(entries):
+                movement, visited_times, mean_value = entries[book_key]
+                book_file.write(OpeningBook.ENTRY.pack(book_key, movement, visited_times, mean_value))
+
+def getBookKey(chessboard, chess):
+    """
+    Return the book key of `chessboard` with `chess` to move, which is the
+    smallest Zobrist hash key over its symmetries, and the symmetry giving it.
+    """
+    black_squares = getSquares(chessboard.getBitboard(State.BLACK))
+    white_squares = getSquares(chessboard.getBitboard(State.WHITE))
+    if chess == State.WHITE:
+        turn_key = ZOBRIST_WHITE_TURN_KEY
+    else:
+        turn_key = 0
+
+    best_key = None
+    best_symmetry = 0
+    for symmetry, squares in enumerate(SYMMETRY_SQUARES):
+        hash_key = turn_key
+        for square in black_squares:
+            hash_key ^= ZOBRIST_KEYS[State.BLACK][squares[square]]
+        for square in white_squares:
+            hash_key ^= ZOBRIST_KEYS[State.WHITE][squares[square]]
+        if best_key is None or hash_key < best_key:
+            best_key = hash_key
+            best_symmetry = symmetry
+    return best_key, best_symmetry
+
+def transformMovement(movement, squares):
+    """
+    Return a packed movement mapped by a square table of `SYMMETRY_SQUARES` or
+    `INVERSE_SYMMETRY_SQUARES`.
+    """
+    from_square, to_square = unpackMovement(movement)
+    return packMovement(squares[from_square], squares[to_square])
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+from .chessboard import State
+from .leaf_parallel_simulation import LeafParallelSimulation
+from .monte_carlo_tree_search import COMPUTATION_LIMIT, findMostVisitedChild, pruneRootMovements, \
+                                               searchTree, searchTreeLeafParallel
+from .node_pool import NodePool
+from .node_state import NodeState
+from .search_statistics import SearchStatistics
+from .tactics import findWinningMovement
+from .time_manager import TimeManager
+from .transposition_table import TranspositionTable
+
+class SearchEngine(object):
+    """ Class
+    Describe a Monte Carlo Tree Search engine which persists across turns.
+    The root of its tree follows the game through both players' movements,
+    so the subtree of the line actually played is kept with its statistics.
+    See `searchTree` for `default_policy` and `treePolicy` for
+    `is_widening`. If `leaf_worker_num` is more than 1, the playouts of
+    `default_policy` run in a pool of that many processes (see
+    `LeafParallelSimulation`), which lives until `close`. Positions of
+    `opening_book` are played from the book without a search. If
+    `is_instrumented`, each search of a movement records a
+    `SearchStatistics` (see `getSearchStatistics`).
+    """
+    def __init__(self, transposition_table=None, default_policy=None, leaf_worker_num=1, node_pool=None, \
+                 is_widening=False, opening_book=None, is_instrumented=False):
+        if transposition_table is None:
+            transposition_table = TranspositionTable()
+        self._transposition_table = transposition_table
+        if node_pool is None:
+            node_pool = NodePool()
+        self._node_pool = node_pool
+        self._default_policy = default_policy
+        self._is_widening = is_widening
+        self._opening_book = opening_book
+        self._is_instrumented = is_instrumented
+        self._search_statistics = None
+        self._leaf_simulation = None
+        if leaf_worker_num > 1:
+            self._leaf_simulation = LeafParallelSimulation(leaf_worker_num, default_policy=default_policy)
+        self._root_node = NodePool.NULL_NODE
+        # The position of the root node.
+        self._chessboard = None
+        self._time_manager = None
+
+    def getNodePool(self):
+        """
+        Return the node pool of the search tree.
+        """
+        return self._node_pool
+
+    def getRootNode(self):
+        """
+        Return the root node of the search tree.
+        """
+        return self._root_node
+
+    def getTranspositionTable(self):
+        """
+        Return the transposition table of this engine.
+        """
+        return self._transposition_table
+
+    def getSearchStatistics(self):
+        """
+        Return the `SearchStatistics` of the last search of a movement, or
+        None if this engine is not instrumented or the movement was played
+        without a search.
+        """
+        return self._search_statistics
+
+    def searchMovement(self, chessboard, chess=State.WHITE, time_limit=None, node_limit=None, \
+                       progress_callback=None, time_manager=None):
+        """
+        Search the best movement of `chess` on `chessboard` within `time_limit`
+        seconds or `node_limit` iterations (`COMPUTATION_LIMIT` iterations if
+        neither is given), or within a given `time_manager`, and advance the
+        root through it. Return the movement as `[[row, column], [row, column]]`,
+        or None if `chess` has no legal movement or the search is stopped. See
+        `searchTree` for `progress_callback`. A movement which wins at once, or
+        else a movement of the opening book, is played without a search.
+        """
+        self._search_statistics = None
+        instant_movement = findWinningMovement(chess, chessboard)
+        if instant_movement is None and self._opening_book is not None:
+            instant_movement = self._opening_book.probeMovement(chessboard, chess)
+        if instant_movement is not None:
+            self.setPosition(chessboard, chess)
+            self.advanceMovement(instant_movement)
+            return NodeState(instant_movement).getBestMovement()
+        
+        if time_manager is None:
+            if time_limit is None and node_limit is None:
+                node_limit = COMPUTATION_LIMIT
+            time_manager = TimeManager(time_limit, node_limit)
+        if self._is_instrumented:
+            self._search_statistics = SearchStatistics()
+        self._searchPosition(chessboard, chess, time_manager, progress_callback, self._search_statistics)
+
+        node_pool = self._node_pool
+        best_child_node = findMostVisitedChild(node_pool, self._root_node)
+        if best_child_node == NodePool.NULL_NODE or time_manager.checkStopped():
+            return None
+        best_movement = node_pool.getBestMovement(best_child_node)
+        self.advanceMovement(node_pool.getMovement(best_child_node))
+        return best_movement
+
+    def ponderPosition(self, chessboard, chess, time_manager):
+        """
+        Search `chessboard` with `chess` (the opponent) to move until
+        `time_manager` stops, without choosing a movement. The tree is kept,
+        so the search of the next movement starts from the subtree of the
+        movement actually played, with its visits. The search of a movement
+        runs at least `TimeManager.CHECK_INTERVAL` iterations before it may
+        stop early. Return the number of iterations.
+        """
+        return self._searchPosition(chessboard, chess, time_manager)
+
+    def stopSearch(self):
+        """
+        Stop the running search, if any. It may be called from another thread.
+        """
+        time_manager = self._time_manager
+        if time_manager is not None:
+            time_manager.stopSearch()
+
+    def close(self):
+        """
+        Stop the worker processes of leaf-parallel search, if any, and close
+        the opening book.
+        """
+        if self._leaf_simulation is not None:
+            self._leaf_simulation.close()
+            self._leaf_simulation = None
+        if self._opening_book is not None:
+            self._opening_book.close()
+            self._opening_book = None
+
+    def setPosition(self, chessboard, chess):
+        """
+        Move the root to `chessboard` with `chess` to move. The current root or
+        one of its children is kept if it is that position; otherwise the tree
+        starts again.
+        """
+        hash_key = chessboard.getHashKey(chess)
+        node_pool = self._node_pool
+        root_node = self._root_node
+        if root_node != NodePool.NULL_NODE:
+            if node_pool.getHashKey(root_node) == hash_key:
+                return
+            for child_node in node_pool.getChildrenNodes(root_node):
+                if node_pool.getHashKey(child_node) == hash_key:
+                    self._setRootNode(child_node, chessboard.copyChessboard())
+                    return
+
+        # The current turn of a node is the side which has just moved.
+        if chess == State.WHITE:
+            turn = State.BLACK
+        else:
+            turn = State.WHITE
+        node_pool.clear()
+        self._root_node = node_pool.addNode(NodePool.NULL_NODE, 0, hash_key, turn, 0)
+        self._chessboard = chessboard.copyChessboard()
+
+    def advanceMovement(self, movement):
+        """
+        Advance the root through a packed movement, keeping its subtree if the
+        movement has been expanded.
+        """
+        node_pool = self._node_pool
+        chessboard = self._chessboard
+        chessboard.makeMovement(movement)
+        for child_node in node_pool.getChildrenNodes(self._root_node):
+            if node_pool.getMovement(child_node) == movement:
+                self._setRootNode(child_node, chessboard)
+                return
+
+        # The side to move after the movement is the side which moved before it.
+        self.setPosition(chessboard, node_pool.getCurrentTurn(self._root_node))
+
+    def _searchPosition(self, chessboard, chess, time_manager, progress_callback=None, search_statistics=None):
+        """
+        Move the root to `chessboard` with `chess` to move and search it until
+        `time_manager` stops, recording `search_statistics` if given. Return
+        the number of iterations.
+        """
+        self._time_manager = time_manager
+        self.setPosition(chessboard, chess)
+        pruneRootMovements(self._node_pool, self._root_node, self._chessboard)
+        self._transposition_table.newSearch()
+        if self._leaf_simulation is not None:
+            iterations = searchTreeLeafParallel(self._node_pool, self._root_node, self._chessboard, time_manager, \
+                                                self._leaf_simulation, self._transposition_table, progress_callback, \
+                                                self._is_widening, search_statistics)
+        else:
+            iterations = searchTree(self._node_pool, self._root_node, self._chessboard, time_manager, \
+                                    self._transposition_table, progress_callback, self._default_policy, \
+                                    self._is_widening, search_statistics)
+        self._time_manager = None
+        return iterations
+
+    def _setRootNode(self, node, chessboard):
+        """
+        Make `node` the root of the tree, dropping the rest of the tree.
+        Rounds are counted from the root, so `MAX_ROUND` starts again.
+        """
+        self._root_node = self._node_pool.keepSubtree(node)
+        self._chessboard = chessboard
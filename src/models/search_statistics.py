@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+from .node_pool import NodePool
+
+class SearchStatistics(object):
+    """ Class
+    Describe the statistics of one search, gathered when it is passed to
+    `searchTree` or `searchTreeLeafParallel` (instrumentation is off
+    otherwise): the time and calls of each phase, and the tree reached
+    (nodes, maximum depth, average playout length and branching factor).
+
+    The time of `treePolicy` includes the time of `expandNode`. The playout
+    length counts the movements a simulation step makes on the scratch
+    chessboard, so it is unknown (None) for `BatchSimulation` and
+    leaf-parallel search, whose playouts are played elsewhere.
+    """
+    PHASES = ['treePolicy', 'expandNode', 'defaultPolicy', 'backPropagation']
+
+    def __init__(self):
+        self._phase_times = dict.fromkeys(SearchStatistics.PHASES, 0.0)
+        self._phase_calls = dict.fromkeys(SearchStatistics.PHASES, 0)
+        self._iterations = 0
+        self._elapsed_time = 0
+        self._max_depth = 0
+        self._total_playout_length = 0
+        self._playout_num = 0
+        self._node_num = 0
+        self._branching_factor = 0
+
+    def getPhaseTime(self, phase):
+        """
+        Return the seconds spent in a phase.
+        """
+        return self._phase_times[phase]
+
+    def getPhaseCalls(self, phase):
+        """
+        Return the number of calls of a phase.
+        """
+        return self._phase_calls[phase]
+
+    def getIterations(self):
+        """
+        Return the number of iterations.
+        """
+        return self._iterations
+
+    def getElapsedTime(self):
+        """
+        Return the seconds of the search.
+        """
+        return self._elapsed_time
+
+    def getMaxDepth(self):
+        """
+        Return the largest depth of a leaf reached by the tree policy.
+        """
+        return self._max_depth
+
+    def getAveragePlayoutLength(self):
+        """
+        Return the average number of movements of the playouts whose length
+        is known, or None if no length is known.
+        """
+        if self._playout_num == 0:
+            return None
+        return self._total_playout_length / self._playout_num
+
+    def getNodeNum(self):
+        """
+        Return the number of nodes of the tree under the root.
+        """
+        return self._node_num
+
+    def getBranchingFactor(self):
+        """
+        Return the average number of children of the nodes with children.
+        """
+        return self._branching_factor
+
+    def addPhaseTime(self, phase, seconds, calls=1):
+        """
+        Add the time and calls of a phase.
+        """
+        self._phase_times[phase] += seconds
+        self._phase_calls[phase] += calls
+
+    def addIteration(self, depth, playout_length=None):
+        """
+        Add an iteration whose leaf is at `depth` and whose playout made
+        `playout_length` movements, or None if the length is not known.
+        """
+        self._iterations += 1
+        if playout_length is not None:
+            self._total_playout_length += playout_length
+            self._playout_num += 1
+        if depth > self._max_depth:
+            self._max_depth = depth
+
+    def setElapsedTime(self, elapsed_time):
+        """
+        Setup the seconds of the search.
+        """
+        self._elapsed_time = elapsed_time
+
+    def collectTreeStatistics(self, node_pool, root_node):
+        """
+        Count the nodes and the branching factor of the tree under
+        `root_node`.
+        """
+        node_num = 0
+        parent_num = 0
+        children_num = 0
+        nodes = [root_node]
+        while nodes:
+            node = nodes.pop()
+            node_num += 1
+            if node_pool.getFirstChildNode(node) != NodePool.NULL_NODE:
+                parent_num += 1
+                children_num += node_pool.getChildrenNum(node)
+                nodes.extend(node_pool.getChildrenNodes(node))
+        self._node_num = node_num
+        self._branching_factor = children_num / parent_num if parent_num else 0
+
+    def toDict(self):
+        """
+        Return these statistics as a dict which can be dumped as JSON.
+        """
+        return {
+            'iterations': self._iterations,
+            'elapsed_time': self._elapsed_time,
+            'phase_times': dict(self._phase_times),
+            'phase_calls': dict(self._phase_calls),
+            'node_num': self._node_num,
+            'max_depth': self._max_depth,
+            'average_playout_length': self.getAveragePlayoutLength(),
+            'branching_factor': self._branching_factor,
+        }
+
+    def formatSummary(self):
+        """
+        Return these statistics as lines of text.
+        """
+        lines = ['{} iterations in {:.2f}s.'.format(self._iterations, self._elapsed_time)]
+        for phase in SearchStatistics.PHASES:
+            lines.append('{}: {:.3f}s, {} calls.'.format(phase, self._phase_times[phase], self._phase_calls[phase]))
+        average_playout_length = self.getAveragePlayoutLength()
+        if average_playout_length is None:
+            average_playout_length = 'n/a'
+        else:
+            average_playout_length = '{:.1f}'.format(average_playout_length)
+        lines.append('Nodes: {}, max depth: {}, average playout length: {}, branching factor: {:.1f}.'.format( \
+                     self._node_num, self._max_depth, average_playout_length, self._branching_factor))
+        return '\n'.join(lines)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+""" Module
+One-move tactics: movements which win at once, and movements which do not
+let the opponent win at once. Used as a pre-check of the root before a
+search and as a prior of expansion.
+"""
+
+from .chessboard import State
+from .get_available_movement import getAllAvailableMovement
+
+def findWinningMovement(chess, chessboard, available_movement=None):
+    """
+    Return a packed movement of `chess` which wins at once (connecting all
+    its chess, or capturing the enemy down to one chess), or None.
+    `available_movement` is the legal movements of `chess` if already known.
+    """
+    if available_movement is None:
+        available_movement = getAllAvailableMovement(chess, chessboard)
+    for movement in available_movement:
+        undo_record = chessboard.makeMovement(movement)
+        winner = chessboard.getWinner(chess, undo_record)
+        chessboard.unmakeMovement(undo_record)
+        if winner == chess:
+            return movement
+    return None
+
+def getSafeMovements(chess, chessboard, available_movement=None):
+    """
+    Return the packed movements of `chess` after which the enemy neither has
+    won (by a capture leaving the enemy connected) nor can win at once.
+    """
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+    if available_movement is None:
+        available_movement = getAllAvailableMovement(chess, chessboard)
+
+    safe_movements = []
+    for movement in available_movement:
+        undo_record = chessboard.makeMovement(movement)
+        winner = chessboard.getWinner(chess, undo_record)
+        if winner == chess or \
+           (winner == State.EMPTY and findWinningMovement(enemy_chess, chessboard) is None):
+            safe_movements.append(movement)
+        chessboard.unmakeMovement(undo_record)
+    return safe_movements
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+from time import time
+from .chessboard import State
+
+class TimeManager(object):
+    """ Class
+    Describe the budget of a search, which is a wall-clock time limit, a
+    node (iteration) limit, or both. The search also stops early once the
+    visit lead of the best movement cannot be overturned within the rest of
+    the budget, or at once when `stopSearch` is called from another thread.
+    The lead is that of the total visits, which choose the movement (see
+    `findMostVisitedChild`), and is only checked after `CHECK_INTERVAL`
+    iterations, when the iteration rate is known.
+    """
+    # Seconds per move, as enforced by `MainWindow.timerRun`.
+    MOVE_TIME_LIMIT = 60
+    # Fractions of the move time limit spent in each phase of the game.
+    OPENING_TIME_RATIO = 0.1
+    MIDDLEGAME_TIME_RATIO = 0.15
+    ENDGAME_TIME_RATIO = 0.05
+    # The opening lasts while at least this many chess are on the chessboard,
+    # and the endgame starts at this many or fewer.
+    OPENING_CHESS_NUM = 22
+    ENDGAME_CHESS_NUM = 14
+    # Iterations between two checks of the visit lead.
+    CHECK_INTERVAL = 16
+
+    def __init__(self, time_limit=None, node_limit=None):
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+        self._time_start = time()
+        self._is_stopped = False
+
+    def getTimeLimit(self):
+        """
+        Return the time limit in seconds, or None.
+        """
+        return self._time_limit
+
+    def getNodeLimit(self):
+        """
+        Return the node limit, or None.
+        """
+        return self._node_limit
+
+    def getElapsedTime(self):
+        """
+        Return the seconds since the search started.
+        """
+        return time() - self._time_start
+
+    def startSearch(self):
+        """
+        Start the clock of a search.
+        """
+        self._time_start = time()
+
+    def stopSearch(self):
+        """
+        Stop the search at the end of the current iteration.
+        """
+        self._is_stopped = True
+
+    def checkStopped(self):
+        """
+        Check if the search has been stopped by `stopSearch`.
+        """
+        return self._is_stopped
+
+    def checkStop(self, iterations, node_pool, root_node):
+        """
+        Check if the search should stop after `iterations` iterations from
+        `root_node` of `node_pool`.
+        """
+        if self._is_stopped:
+            return True
+        if self._node_limit is not None and iterations >= self._node_limit:
+            return True
+        elapsed_time = time() - self._time_start
+        if self._time_limit is not None and elapsed_time >= self._time_limit:
+            return True
+        if iterations < TimeManager.CHECK_INTERVAL or iterations % TimeManager.CHECK_INTERVAL != 0:
+            return False
+
+        # Estimate the remaining iterations from the budget left.
+        remaining_iterations = None
+        if self._node_limit is not None:
+            remaining_iterations = self._node_limit - iterations
+        if self._time_limit is not None and elapsed_time > 0:
+            remaining_by_time = iterations / elapsed_time * (self._time_limit - elapsed_time)
+            if remaining_iterations is None or remaining_by_time < remaining_iterations:
+                remaining_iterations = remaining_by_time
+        if remaining_iterations is None:
+            return False
+
+        best_visited_times = 0
+        second_visited_times = 0
+        for child_node in node_pool.getChildrenNodes(root_node):
+            visited_times = node_pool.getVisitedTimes(child_node)
+            if visited_times > best_visited_times:
+                second_visited_times = best_visited_times
+                best_visited_times = visited_times
+            elif visited_times > second_visited_times:
+                second_visited_times = visited_times
+        return best_visited_times - second_visited_times > remaining_iterations
+
+    @staticmethod
+    def allocateTime(chessboard, move_time_limit=MOVE_TIME_LIMIT):
+        """
+        Return the seconds to spend on a move of `chessboard` according to the
+        phase of the game.
+        """
+        chess_num = chessboard.countChess(State.BLACK) + chessboard.countChess(State.WHITE)
+        if chess_num >= TimeManager.OPENING_CHESS_NUM:
+            return move_time_limit * TimeManager.OPENING_TIME_RATIO
+        elif chess_num <= TimeManager.ENDGAME_CHESS_NUM:
+            return move_time_limit * TimeManager.ENDGAME_TIME_RATIO
+        else:
+            return move_time_limit * TimeManager.MIDDLEGAME_TIME_RATIO
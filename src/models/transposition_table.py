@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+
+class TranspositionTable(object):
+    """ Class
+    Describe a bounded transposition table mapping the hash keys of positions
+    to the visited times and quality value gathered by the search, so that
+    identical positions reached by different movement orders share them.
+
+    Entries live in preallocated arrays grouped into buckets of
+    `BUCKET_SIZE` slots. A new key replaces, in order of preference, an empty
+    slot, a slot left by an earlier search, or the least visited slot.
+    """
+    MEMORY_LIMIT = 16 * 1024 * 1024
+    BUCKET_SIZE = 2
+    # Bytes per entry: key, visited times, quality value and generation.
+    ENTRY_SIZE = 8 + 4 + 8 + 1
+    _MAX_VISITED_TIMES = (1 << 32) - 1
+
+    def __init__(self, memory_limit=MEMORY_LIMIT):
+        bucket_num = max(1, memory_limit // (TranspositionTable.ENTRY_SIZE * TranspositionTable.BUCKET_SIZE))
+        self._bucket_num = bucket_num
+        self._size = bucket_num * TranspositionTable.BUCKET_SIZE
+        self._generation = 0
+        self.clear()
+
+    def getSize(self):
+        """
+        Return the number of slots of this table.
+        """
+        return self._size
+
+    def getEntryNum(self):
+        """
+        Return the number of used slots of this table.
+        """
+        return self._entry_num
+
+    def newSearch(self):
+        """
+        Start a new search. Entries of earlier searches are kept but become
+        the first candidates for replacement.
+        """
+        self._generation = (self._generation + 1) & 0xFF
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        self._keys = array('Q', [0]) * self._size
+        self._visited_times = array('I', [0]) * self._size
+        self._quality_values = array('d', [0]) * self._size
+        self._generations = array('B', [0]) * self._size
+        self._entry_num = 0
+
+    def findEntry(self, hash_key):
+        """
+        Return the slot of a hash key, or -1 if it is not in this table.
+        """
+        index = (hash_key % self._bucket_num) * TranspositionTable.BUCKET_SIZE
+        keys = self._keys
+        for slot in range(index, index + TranspositionTable.BUCKET_SIZE):
+            if keys[slot] == hash_key:
+                return slot
+        return -1
+
+    def getVisitedTimes(self, slot):
+        """
+        Return the visited times of a slot.
+        """
+        return self._visited_times[slot]
+
+    def getQualityValue(self, slot):
+        """
+        Return the quality value of a slot.
+        """
+        return self._quality_values[slot]
+
+    def update(self, hash_key, reward):
+        """
+        Add one visit with `reward` to the entry of a hash key, storing the
+        key first if it is not in this table.
+        """
+        index = (hash_key % self._bucket_num) * TranspositionTable.BUCKET_SIZE
+        keys = self._keys
+        visited_times = self._visited_times
+        generations = self._generations
+
+        replaced_slot = -1
+        for slot in range(index, index + TranspositionTable.BUCKET_SIZE):
+            if keys[slot] == hash_key:
+                generations[slot] = self._generation
+                if visited_times[slot] < TranspositionTable._MAX_VISITED_TIMES:
+                    visited_times[slot] += 1
+                    self._quality_values[slot] += reward
+                return
+            if replaced_slot == -1 or self._checkReplacedFirst(slot, replaced_slot):
+                replaced_slot = slot
+
+        if keys[replaced_slot] == 0:
+            self._entry_num += 1
+        keys[replaced_slot] = hash_key
+        visited_times[replaced_slot] = 1
+        self._quality_values[replaced_slot] = reward
+        generations[replaced_slot] = self._generation
+
+    def _checkReplacedFirst(self, slot, other_slot):
+        """
+        Check if `slot` should be replaced before `other_slot`.
+        """
+        if self._keys[other_slot] == 0:
+            return False
+        if self._keys[slot] == 0:
+            return True
+        is_old = self._generations[slot] != self._generation
+        is_other_old = self._generations[other_slot] != self._generation
+        if is_old != is_other_old:
+            return is_old
+        return self._visited_times[slot] < self._visited_times[other_slot]
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from random import Random
+
+def _buildZobristKeys():
+    """
+    Build the Zobrist keys. The seed is fixed so hash keys are the same in
+    every process and can be stored on disk.
+    """
+    generator = Random(0x4C4F41)
+    chess_keys = [[0] * 64] + [[generator.getrandbits(64) for _ in range(64)] for _ in range(2)]
+    return chess_keys, generator.getrandbits(64)
+
+# `ZOBRIST_KEYS[chess][square]`; the keys of `State.EMPTY` are zero.
+ZOBRIST_KEYS, ZOBRIST_WHITE_TURN_KEY = _buildZobristKeys()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks of the engine hot paths on a fixed corpus of opening,
+middlegame and endgame positions: move generations, connectivity checks,
+playouts and MCTS iterations per second. Results can be written as JSON
+and compared with a saved baseline, flagging regressions.
+
+Usage: python -m src.tools.benchmark [--duration SECONDS] [--output PATH]
+                                     [--compare BASELINE] [--threshold RATIO]
+"""
+
+from argparse import ArgumentParser
+from json import dump, load
+from platform import python_version
+from random import seed
+from src.models.chessboard import Chessboard, State
+from src.models.eight_connectivity_two_pass import checkEightConnectivity, eightConnectivityTwoPass
+from src.models.get_available_movement import getAllAvailableMovement
+from src.models.monte_carlo_tree_search import defaultPolicy, searchTree
+from src.models.node_pool import NodePool
+from src.models.node_state import NodeState
+from src.models.time_manager import TimeManager
+from src.models.transposition_table import TranspositionTable
+from sys import exit
+from time import perf_counter
+
+# `[phase, side to move, black bitboard, white bitboard]`, taken from random
+# games with a fixed seed.
+CORPUS = [
+    ['opening', State.BLACK, 0x560002100000007E, 0x208181810101A100],
+    ['opening', State.BLACK, 0x170088000000007E, 0x000101A10121A100],
+    ['opening', State.BLACK, 0x7A0010000090001E, 0x0181818190008100],
+    ['middlegame', State.WHITE, 0x604000104400041A, 0x00A1800020092100],
+    ['middlegame', State.WHITE, 0x1000602000081203, 0x00809308004004A0],
+    ['middlegame', State.WHITE, 0x220000480A000241, 0x0084000485002128],
+    ['endgame', State.WHITE, 0x0510000401010410, 0x0000202010400000],
+    ['endgame', State.WHITE, 0x0200110000802068, 0x1000001100000004],
+    ['endgame', State.WHITE, 0x0140100100002880, 0x6010000000A00000],
+]
+RANDOM_SEED = 0x4C4F41
+# Iterations of one MCTS search of the benchmark.
+SEARCH_NODE_LIMIT = 50
+
+def createCorpus():
+    """
+    Return `[phase, side to move, chessboard]` of the corpus positions.
+    """
+    corpus = []
+    for phase, chess, black_bitboard, white_bitboard in CORPUS:
+        chessboard = Chessboard()
+        chessboard.setBitboards(black_bitboard, white_bitboard)
+        corpus.append([phase, chess, chessboard])
+    return corpus
+
+def measureRate(run_round, duration):
+    """
+    Call `run_round()` (which returns its number of operations) until
+    `duration` seconds have passed. Return the operations per second.
+    """
+    operation_num = 0
+    time_start = perf_counter()
+    while True:
+        operation_num += run_round()
+        elapsed_time = perf_counter() - time_start
+        if elapsed_time >= duration:
+            return operation_num / elapsed_time
+
+def benchmarkMovementGeneration(corpus, duration):
+    """
+    Return the move generations (of all legal movements of one side) per
+    second.
+    """
+    def runRound():
+        for _, _, chessboard in corpus:
+            getAllAvailableMovement(State.BLACK, chessboard)
+            getAllAvailableMovement(State.WHITE, chessboard)
+        return 2 * len(corpus)
+    return measureRate(runRound, duration)
+
+def benchmarkConnectivity(corpus, duration, check_connectivity):
+    """
+    Return the connectivity checks of one side per second by
+    `check_connectivity(bitboard)`.
+    """
+    bitboards = []
+    for _, _, chessboard in corpus:
+        bitboards.append(chessboard.getBitboard(State.BLACK))
+        bitboards.append(chessboard.getBitboard(State.WHITE))
+
+    def runRound():
+        for bitboard in bitboards:
+            check_connectivity(bitboard)
+        return len(bitboards)
+    return measureRate(runRound, duration)
+
+def benchmarkPlayout(corpus, duration):
+    """
+    Return the random playouts (`defaultPolicy`) per second.
+    """
+    def runRound():
+        for _, chess, chessboard in corpus:
+            state = NodeState()
+            # The current turn of a state is the side which has just moved.
+            if chess == State.WHITE:
+                state.setCurrentTurn(State.BLACK)
+            else:
+                state.setCurrentTurn(State.WHITE)
+            history = []
+            defaultPolicy(state, chessboard, history)
+            while history:
+                chessboard.unmakeMovement(history.pop())
+        return len(corpus)
+    return measureRate(runRound, duration)
+
+def benchmarkSearch(corpus, duration):
+    """
+    Return the MCTS iterations per second of searches of `SEARCH_NODE_LIMIT`
+    iterations.
+    """
+    node_pool = NodePool()
+    transposition_table = TranspositionTable()
+
+    def runRound():
+        iterations = 0
+        for _, chess, chessboard in corpus:
+            if chess == State.WHITE:
+                turn = State.BLACK
+            else:
+                turn = State.WHITE
+            node_pool.clear()
+            transposition_table.newSearch()
+            init_node = node_pool.addNode(NodePool.NULL_NODE, 0, chessboard.getHashKey(chess), turn, 0)
+            iterations += searchTree(node_pool, init_node, chessboard, TimeManager(node_limit=SEARCH_NODE_LIMIT), \
+                                     transposition_table)
+        return iterations
+    return measureRate(runRound, duration)
+
+def runBenchmarks(duration):
+    """
+    Return `{benchmark name: operations per second}`.
+    """
+    seed(RANDOM_SEED)
+    corpus = createCorpus()
+    return {
+        'movement_generations_per_second': benchmarkMovementGeneration(corpus, duration),
+        'connectivity_checks_per_second': benchmarkConnectivity(corpus, duration, checkEightConnectivity),
+        'two_pass_connectivity_checks_per_second': benchmarkConnectivity(corpus, duration, \
+                                                                         eightConnectivityTwoPass),
+        'playouts_per_second': benchmarkPlayout(corpus, duration),
+        'mcts_iterations_per_second': benchmarkSearch(corpus, duration),
+    }
+
+def compareResults(results, baseline, threshold):
+    """
+    Return `[name, rate, baseline rate, ratio, is regression]` rows. A
+    benchmark regresses if it is slower than the baseline by more than
+    `threshold` (a ratio).
+    """
+    rows = []
+    for name, rate in results.items():
+        if name not in baseline:
+            continue
+        ratio = rate / baseline[name]
+        rows.append([name, rate, baseline[name], ratio, ratio < 1 - threshold])
+    return rows
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Micro-benchmarks of the engine hot paths.')
+    parser.add_argument('--duration', type=float, default=2, help='seconds per benchmark')
+    parser.add_argument('--output', default=None, help='path of the JSON results')
+    parser.add_argument('--compare', default=None, help='path of the JSON results of a baseline')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slowdown ratio flagged as a regression')
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.duration)
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            dump({'python_version': python_version(), 'duration': args.duration, 'results': results}, \
+                 output_file, indent=2)
+
+    if args.compare is None:
+        for name, rate in results.items():
+            print('{:<42} {:>14.1f}'.format(name, rate))
+        return
+
+    with open(args.compare) as baseline_file:
+        baseline = load(baseline_file)['results']
+    print('{:<42} {:>14} {:>14} {:>7}'.format('benchmark', 'rate', 'baseline', 'ratio'))
+    is_regressed = False
+    for name, rate, baseline_rate, ratio, is_regression in compareResults(results, baseline, args.threshold):
+        print('{:<42} {:>14.1f} {:>14.1f} {:>7.2f}{}'.format(name, rate, baseline_rate, ratio, \
+                                                            '  REGRESSION' if is_regression else ''))
+        is_regressed = is_regressed or is_regression
+    if is_regressed:
+        exit(1)
+
+if __name__ == '__main__':
+    main()
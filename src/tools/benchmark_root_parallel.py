@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the scaling of root-parallel MCTS.
+
+Usage: python -m src.tools.benchmark_root_parallel [--time-limit SECONDS] [--max-worker-num N]
+"""
+
+from argparse import ArgumentParser
+from multiprocessing import Pool, cpu_count
+from src.models.chessboard import Chessboard
+from src.models.monte_carlo_tree_search import searchRootParallel
+from time import time
+
+def benchmarkRootParallel(time_limit, max_worker_num):
+    """
+    Return `[worker_num, iterations per second, speedup]` rows for 1 to
+    `max_worker_num` workers searching the starting position.
+    """
+    chessboard = Chessboard()
+    rows = []
+    base_rate = None
+    for worker_num in range(1, max_worker_num + 1):
+        # The pool is started before the clock so only the search is timed.
+        with Pool(worker_num) as pool:
+            time_start = time()
+            _, iterations = searchRootParallel(chessboard, worker_num, time_limit, pool=pool)
+            elapsed_time = time() - time_start
+        rate = iterations / elapsed_time
+        if base_rate is None:
+            base_rate = rate
+        rows.append([worker_num, rate, rate / base_rate])
+    return rows
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Benchmark the scaling of root-parallel MCTS.')
+    parser.add_argument('--time-limit', type=float, default=3, help='seconds per search')
+    parser.add_argument('--max-worker-num', type=int, default=cpu_count(), \
+                        help='largest number of worker processes')
+    args = parser.parse_args()
+
+    print('Cores: {}'.format(cpu_count()))
+    print('{:>8} {:>14} {:>8}'.format('workers', 'iterations/s', 'speedup'))
+    for worker_num, rate, speedup in benchmarkRootParallel(args.time_limit, args.max_worker_num):
+        print('{:>8} {:>14.1f} {:>8.2f}'.format(worker_num, rate, speedup))
+
+if __name__ == '__main__':
+    main()
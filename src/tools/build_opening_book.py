@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Build an opening book from parallel self-play. Each game plays the first
+`--depth` movements of both sides by MCTS with `--node-limit` iterations per
+movement; the statistics of every position are merged over the games (and
+over symmetric positions), and the most visited movement is written.
+
+Usage: python -m src.tools.build_opening_book [--output PATH] [--game-num N] [--depth PLIES]
+                                              [--node-limit N] [--worker-num N]
+"""
+
+from argparse import ArgumentParser
+from multiprocessing import Pool, cpu_count
+from random import getrandbits, seed
+from src.models.chessboard import Chessboard, State
+from src.models.opening_book import SYMMETRY_SQUARES, OpeningBook, getBookKey, transformMovement
+from src.models.search_engine import SearchEngine
+from time import time
+
+def buildOpeningBook(game_num, depth, node_limit, worker_num):
+    """
+    Return the book entries, `{book key: (packed movement, visited times,
+    mean value)}`, of `game_num` self-play games played by `worker_num`
+    processes.
+    """
+    base_seed = getrandbits(32)
+    tasks = [(base_seed + i, depth, node_limit) for i in range(game_num)]
+    with Pool(worker_num) as pool:
+        games = pool.map(_playSelfPlayGame, tasks)
+
+    # `{book key: {canonical movement: [visited times, total value]}}`.
+    statistics = {}
+    for game in games:
+        for book_key, movement, visited_times, mean_value in game:
+            movement_statistics = statistics.setdefault(book_key, {}).setdefault(movement, [0, 0])
+            movement_statistics[0] += visited_times
+            movement_statistics[1] += visited_times * mean_value
+
+    entries = {}
+    for book_key, movement_statistics in statistics.items():
+        movement, (visited_times, total_value) = max(movement_statistics.items(), key=lambda item: item[1][0])
+        entries[book_key] = (movement, visited_times, total_value / visited_times)
+    return entries
+
+def _playSelfPlayGame(task):
+    """
+    Play the opening of one self-play game in a worker process. Return the
+    `(book key, canonical movement, visited times, mean value)` of each
+    position, the value being from the view of the side to move.
+    """
+    random_seed, depth, node_limit = task
+    seed(random_seed)
+    chessboard = Chessboard()
+    search_engine = SearchEngine()
+    chess = State.BLACK
+    game = []
+    for _ in range(depth):
+        best_movement = search_engine.searchMovement(chessboard, chess, node_limit=node_limit)
+        if best_movement is None:
+            break
+        # The root is now the child of the chosen movement.
+        node_pool = search_engine.getNodePool()
+        root_node = search_engine.getRootNode()
+        movement = node_pool.getMovement(root_node)
+        visited_times = node_pool.getVisitedTimes(root_node)
+        mean_value = node_pool.getQualityValue(root_node) / max(1, visited_times)
+        if chess == State.BLACK:
+            mean_value = -mean_value
+
+        book_key, symmetry = getBookKey(chessboard, chess)
+        game.append((book_key, transformMovement(movement, SYMMETRY_SQUARES[symmetry]), visited_times, mean_value))
+        undo_record = chessboard.makeMovement(movement)
+        if chessboard.getWinner(chess, undo_record) != State.EMPTY:
+            break
+        if chess == State.BLACK:
+            chess = State.WHITE
+        else:
+            chess = State.BLACK
+    return game
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Build an opening book from parallel self-play.')
+    parser.add_argument('--output', default=OpeningBook.BOOK_PATH, help='path of the book file')
+    parser.add_argument('--game-num', type=int, default=64, help='number of self-play games')
+    parser.add_argument('--depth', type=int, default=8, help='movements per game')
+    parser.add_argument('--node-limit', type=int, default=2000, help='iterations per movement')
+    parser.add_argument('--worker-num', type=int, default=cpu_count(), help='number of worker processes')
+    args = parser.parse_args()
+
+    time_start = time()
+    entries = buildOpeningBook(args.game_num, args.depth, args.node_limit, args.worker_num)
+    OpeningBook.writeBook(args.output, entries)
+    print('{} entries written to {} in {:.1f} s.'.format(len(entries), args.output, time() - time_start))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the cold start of the engine: new Python processes import the
+engine package, create a `SearchEngine` and search the first movement.
+Reports the median and the fastest time of each step, and whether PyQt5 or
+NumPy was imported, which a headless engine should not do.
+
+Usage: python -m src.tools.cold_start [--run-num N] [--node-limit N]
+"""
+
+from argparse import ArgumentParser
+from json import loads
+from statistics import median
+from subprocess import check_output
+from sys import executable
+from time import perf_counter
+
+# Run in each new process; prints the seconds of each step as JSON.
+COLD_START_SCRIPT = '''
+from time import perf_counter
+time_start = perf_counter()
+from src.models import Chessboard, SearchEngine, State
+time_import = perf_counter()
+search_engine = SearchEngine()
+time_engine = perf_counter()
+search_engine.searchMovement(Chessboard(), State.BLACK, node_limit={node_limit})
+time_movement = perf_counter()
+from json import dumps
+import sys
+print(dumps({{'import': time_import - time_start, 'engine': time_engine - time_import,
+        'first_movement': time_movement - time_engine,
+        'gui_modules': [name for name in ('PyQt5', 'numpy') if name in sys.modules]}}))
+'''
+STEPS = ['interpreter', 'import', 'engine', 'first_movement', 'total']
+
+def measureColdStart(node_limit):
+    """
+    Return `{step: seconds}` of one new process, and the GUI modules it
+    imported. The interpreter step is the rest of the process time.
+    """
+    script = COLD_START_SCRIPT.format(node_limit=node_limit)
+    time_start = perf_counter()
+    output = check_output([executable, '-c', script], universal_newlines=True)
+    total_time = perf_counter() - time_start
+    result = loads(output)
+    gui_modules = result.pop('gui_modules')
+    result['total'] = total_time
+    result['interpreter'] = total_time - result['import'] - result['engine'] - result['first_movement']
+    return result, gui_modules
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Measure the cold start of the engine.')
+    parser.add_argument('--run-num', type=int, default=10, help='number of new processes')
+    parser.add_argument('--node-limit', type=int, default=100, help='iterations of the first search')
+    args = parser.parse_args()
+
+    results = []
+    gui_modules = set()
+    for _ in range(args.run_num):
+        result, run_gui_modules = measureColdStart(args.node_limit)
+        results.append(result)
+        gui_modules.update(run_gui_modules)
+
+    print('{:<16} {:>10} {:>10}'.format('step', 'median', 'fastest'))
+    for step in STEPS:
+        times = [result[step] for result in results]
+        print('{:<16} {:>9.1f}ms {:>9.1f}ms'.format(step, median(times) * 1000, min(times) * 1000))
+    if gui_modules:
+        print('Imported GUI modules: {}'.format(', '.join(sorted(gui_modules))))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+Count the leaf nodes of the movement tree of a position to a fixed depth
+(perft), to check the correctness and the speed of the movement generator.
+The last ply is counted without making its movements (bulk counting),
+subtree counts are cached by Zobrist hash key, and the root movements can be
+split over worker processes. Like perft in chess, the tree only follows the
+movement generator: won positions are not leaves, and a side without a legal
+movement ends its line with no leaf.
+
+Usage: python -m src.tools.perft [--depth N] [--black BITBOARD] [--white BITBOARD] [--chess COLOR]
+                                 [--worker-num N] [--no-bulk] [--no-cache] [--divide]
+"""
+
+from argparse import ArgumentParser
+from multiprocessing import Pool, cpu_count
+from src.models.chessboard import Chessboard, State
+from src.models.get_available_movement import countAvailableMovement, getAllAvailableMovement
+from src.models.node_state import NodeState
+from time import perf_counter
+
+# Subtree counts of a worker process, kept over its tasks.
+_worker_cache = {}
+
+def perft(chessboard, chess, depth, is_bulk=True, cache=None):
+    """
+    Return the number of leaf nodes `depth` plies below `chessboard` with
+    `chess` to move. With `is_bulk`, the movements of the last ply are
+    counted without being made. If `cache` (a dict) is given, it keeps the
+    count of each subtree by `(hash key, depth)`, so transpositions are
+    counted once.
+    """
+    if depth == 0:
+        return 1
+    if is_bulk and depth == 1:
+        return countAvailableMovement(chess, chessboard)
+    if cache is not None:
+        cache_key = (chessboard.getHashKey(chess), depth)
+        node_num = cache.get(cache_key)
+        if node_num is not None:
+            return node_num
+
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+    node_num = 0
+    for movement in getAllAvailableMovement(chess, chessboard):
+        undo_record = chessboard.makeMovement(movement)
+        node_num += perft(chessboard, enemy_chess, depth - 1, is_bulk, cache)
+        chessboard.unmakeMovement(undo_record)
+
+    if cache is not None:
+        cache[cache_key] = node_num
+    return node_num
+
+def _perftWorker(task):
+    """
+    Count the leaf nodes below one root movement in a worker process.
+    """
+    packed_chessboard, chess, movement, depth, is_bulk, is_cached = task
+    chessboard = Chessboard()
+    chessboard.unpackChessboard(packed_chessboard)
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+    chessboard.makeMovement(movement)
+    return perft(chessboard, enemy_chess, depth - 1, is_bulk, _worker_cache if is_cached else None)
+
+def dividePerft(chessboard, chess, depth, worker_num=1, is_bulk=True, is_cached=True):
+    """
+    Return `{packed root movement: number of leaf nodes}` of `perft`. If
+    `worker_num` is more than 1, the root movements are split over that many
+    processes, each with its own cache.
+    """
+    movements = getAllAvailableMovement(chess, chessboard)
+    if depth == 0 or not movements:
+        return {}
+
+    if worker_num > 1:
+        packed_chessboard = chessboard.packChessboard()
+        tasks = [(packed_chessboard, chess, movement, depth, is_bulk, is_cached) for movement in movements]
+        with Pool(worker_num) as pool:
+            node_nums = pool.map(_perftWorker, tasks)
+        return dict(zip(movements, node_nums))
+
+    if chess == State.BLACK:
+        enemy_chess = State.WHITE
+    else:
+        enemy_chess = State.BLACK
+    cache = {} if is_cached else None
+    chessboard = chessboard.copyChessboard()
+    divided_node_nums = {}
+    for movement in movements:
+        undo_record = chessboard.makeMovement(movement)
+        divided_node_nums[movement] = perft(chessboard, enemy_chess, depth - 1, is_bulk, cache)
+        chessboard.unmakeMovement(undo_record)
+    return divided_node_nums
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Count the leaf nodes of the movement tree of a position.')
+    parser.add_argument('--depth', type=int, default=3, help='plies of the tree')
+    parser.add_argument('--black', default=None, help='black bitboard (hexadecimal)')
+    parser.add_argument('--white', default=None, help='white bitboard (hexadecimal)')
+    parser.add_argument('--chess', choices=['black', 'white'], default='black', help='side to move')
+    parser.add_argument('--worker-num', type=int, default=cpu_count(), help='number of worker processes')
+    parser.add_argument('--no-bulk', action='store_true', help='make the movements of the last ply')
+    parser.add_argument('--no-cache', action='store_true', help='count transpositions again')
+    parser.add_argument('--divide', action='store_true', help='print the count of each root movement')
+    args = parser.parse_args()
+
+    chessboard = Chessboard()
+    if args.black is not None and args.white is not None:
+        chessboard.setBitboards(int(args.black, 16), int(args.white, 16))
+    if args.chess == 'white':
+        chess = State.WHITE
+    else:
+        chess = State.BLACK
+
+    time_start = perf_counter()
+    divided_node_nums = dividePerft(chessboard, chess, args.depth, args.worker_num, not args.no_bulk, \
+                                    not args.no_cache)
+    elapsed_time = perf_counter() - time_start
+    node_num = sum(divided_node_nums.values()) if args.depth > 0 else 1
+
+    if args.divide:
+        for movement, movement_node_num in divided_node_nums.items():
+            (from_row, from_column), (to_row, to_column) = NodeState(movement).getBestMovement()
+            print('({}, {}) -> ({}, {}): {}'.format(from_column + 1, from_row + 1, to_column + 1, to_row + 1, \
+                                                    movement_node_num))
+    print('Depth: {}, nodes: {}, time: {:.3f} s, nodes/s: {:.0f}'.format(args.depth, node_num, elapsed_time, \
+                                                                        node_num / max(elapsed_time, 1e-9)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Profile one MCTS search: the time and calls of each phase (`treePolicy`,
+`expandNode`, `defaultPolicy` and `backPropagation`) and the tree reached
+(nodes, maximum depth, average playout length and branching factor). The
+position is the starting position unless bitboards are given.
+
+Usage: python -m src.tools.profile_search [--black BITBOARD] [--white BITBOARD] [--chess COLOR]
+                                          [--node-limit N] [--time-limit SECONDS] [--policy POLICY]
+                                          [--widening] [--json] [--output PATH]
+"""
+
+from argparse import ArgumentParser
+from json import dump, dumps
+from src.models.chessboard import Chessboard, State
+from src.models.search_engine import SearchEngine
+from src.tools.tournament import POLICIES, createDefaultPolicy
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Profile one MCTS search.')
+    parser.add_argument('--black', default=None, help='black bitboard (hexadecimal)')
+    parser.add_argument('--white', default=None, help='white bitboard (hexadecimal)')
+    parser.add_argument('--chess', choices=['black', 'white'], default='black', help='side to move')
+    parser.add_argument('--node-limit', type=int, default=None, help='iterations of the search')
+    parser.add_argument('--time-limit', type=float, default=None, help='seconds of the search')
+    parser.add_argument('--policy', choices=POLICIES, default='random', help='playout policy')
+    parser.add_argument('--widening', action='store_true', help='progressive widening')
+    parser.add_argument('--json', action='store_true', help='print the statistics as JSON')
+    parser.add_argument('--output', default=None, help='path of the JSON statistics')
+    args = parser.parse_args()
+
+    chessboard = Chessboard()
+    if args.black is not None and args.white is not None:
+        chessboard.setBitboards(int(args.black, 16), int(args.white, 16))
+    if args.chess == 'white':
+        chess = State.WHITE
+    else:
+        chess = State.BLACK
+
+    search_engine = SearchEngine(default_policy=createDefaultPolicy(args.policy), is_widening=args.widening, \
+                                 is_instrumented=True)
+    best_movement = search_engine.searchMovement(chessboard, chess, time_limit=args.time_limit, \
+                                                 node_limit=args.node_limit)
+    search_statistics = search_engine.getSearchStatistics()
+    search_engine.close()
+    if search_statistics is None:
+        print('Best movement: {} (played without a search).'.format(best_movement))
+        return
+
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            dump(search_statistics.toDict(), output_file, indent=2)
+    if args.json:
+        print(dumps(search_statistics.toDict(), indent=2))
+    else:
+        print('Best movement: {}.'.format(best_movement))
+        print(search_statistics.formatSummary())
+
+if __name__ == '__main__':
+    main()
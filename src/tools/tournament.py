@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+"""
+Play a headless engine-vs-engine tournament. Engines A and B are configured
+separately (iterations or time per movement, playout policy, progressive
+widening, leaf- or root-parallel worker processes); games run in parallel
+processes with colors alternating, and the tool reports games per second,
+the score of A with a 95% confidence interval, the Elo difference and the
+average time per movement.
+
+Usage: python -m src.tools.tournament [--game-num N] [--worker-num N]
+                                      [--a-node-limit N] [--a-time-limit SECONDS] [--a-policy POLICY] [--a-widening]
+                                      [--a-leaf-worker-num N] [--a-root-worker-num N]
+                                      [--b-node-limit N] [--b-time-limit SECONDS] [--b-policy POLICY] [--b-widening]
+                                      [--b-leaf-worker-num N] [--b-root-worker-num N]
+"""
+
+from argparse import ArgumentParser
+from math import log10, sqrt
+from multiprocessing import Pool, Process, Queue, cpu_count
+from random import getrandbits, seed
+from src.models.bitboard import getSquare, packMovement
+from src.models.chessboard import Chessboard, State
+from src.models.cutoff_simulation import CutoffSimulation
+from src.models.monte_carlo_tree_search import COMPUTATION_LIMIT, findMostVisitedMovement, searchRootParallel
+from src.models.node_state import NodeState
+from src.models.search_engine import SearchEngine
+from src.models.tactics import findWinningMovement
+from time import time
+
+POLICIES = ['random', 'cutoff', 'heavy', 'batch']
+# Probability of a random movement in heavy playouts.
+HEAVY_EPSILON = 0.2
+# A game reaching this many movements is a draw.
+MAX_GAME_LENGTH = 300
+# Two-sided 95% normal quantile, for the Wilson score interval.
+CONFIDENCE_Z = 1.96
+
+def createDefaultPolicy(policy):
+    """
+    Return the default policy of a name of `POLICIES`, or None for random
+    playouts.
+    """
+    if policy == 'cutoff':
+        return CutoffSimulation().defaultPolicy
+    elif policy == 'heavy':
+        return CutoffSimulation(epsilon=HEAVY_EPSILON).defaultPolicy
+    elif policy == 'batch':
+        # NumPy is only needed for this policy.
+        from src.models.batch_simulation import BatchSimulation
+        return BatchSimulation().defaultPolicy
+    return None
+
+def createSearchEngine(engine_setting):
+    """
+    Return a `SearchEngine` of an engine setting, a dict of `policy`,
+    `is_widening` and `leaf_worker_num` (see `main` for the options).
+    """
+    return SearchEngine(default_policy=createDefaultPolicy(engine_setting['policy']), \
+                        leaf_worker_num=engine_setting['leaf_worker_num'], \
+                        is_widening=engine_setting['is_widening'])
+
+def checkParallel(engine_setting):
+    """
+    Check if an engine setting searches in worker processes of its own.
+    """
+    return engine_setting['leaf_worker_num'] > 1 or engine_setting['root_worker_num'] > 1
+
+def searchRootMovement(chessboard, chess, engine_setting, pool):
+    """
+    Search the movement of `chess` on `chessboard` by root-parallel MCTS in
+    the `root_worker_num` processes of `pool`. Return it as
+    `[[row, column], [row, column]]`, or None if there is no movement.
+    """
+    winning_movement = findWinningMovement(chess, chessboard)
+    if winning_movement is not None:
+        return NodeState(winning_movement).getBestMovement()
+    time_limit = engine_setting['time_limit']
+    node_limit = engine_setting['node_limit']
+    if time_limit is None and node_limit is None:
+        node_limit = COMPUTATION_LIMIT
+    root_statistics, _ = searchRootParallel(chessboard, engine_setting['root_worker_num'], time_limit, node_limit, \
+                                            pool, createDefaultPolicy(engine_setting['policy']), chess)
+    return findMostVisitedMovement(root_statistics, chess)
+
+def playGame(task):
+    """
+    Play one game in a worker process. Return `(winner, movement numbers,
+    search seconds)`, where the winner is 'a', 'b' or None for a draw and
+    the others are dicts keyed by 'a' and 'b'.
+    """
+    random_seed, a_setting, b_setting, is_a_black = task
+    seed(random_seed)
+    settings = {'a': a_setting, 'b': b_setting}
+    # A root-parallel engine keeps one pool for the game instead of a tree.
+    engines = {}
+    root_pools = {}
+    for player, setting in settings.items():
+        if setting['root_worker_num'] > 1:
+            root_pools[player] = Pool(setting['root_worker_num'])
+        else:
+            engines[player] = createSearchEngine(setting)
+    if is_a_black:
+        players = {State.BLACK: 'a', State.WHITE: 'b'}
+    else:
+        players = {State.BLACK: 'b', State.WHITE: 'a'}
+    movement_nums = {'a': 0, 'b': 0}
+    search_times = {'a': 0, 'b': 0}
+
+    chessboard = Chessboard()
+    chess = State.BLACK
+    winner = None
+    for _ in range(MAX_GAME_LENGTH):
+        player = players[chess]
+        setting = settings[player]
+        time_start = time()
+        if player in root_pools:
+            best_movement = searchRootMovement(chessboard, chess, setting, root_pools[player])
+        else:
+            best_movement = engines[player].searchMovement(chessboard, chess, time_limit=setting['time_limit'], \
+                                                           node_limit=setting['node_limit'])
+        search_times[player] += time() - time_start
+        movement_nums[player] += 1
+        # No legal movement; the game is scored as a draw.
+        if best_movement is None:
+            break
+
+        (from_row, from_column), (to_row, to_column) = best_movement
+        undo_record = chessboard.makeMovement(packMovement(getSquare(from_column, from_row), \
+                                                           getSquare(to_column, to_row)))
+        game_winner = chessboard.getWinner(chess, undo_record)
+        if game_winner != State.EMPTY:
+            winner = players[game_winner]
+            break
+        if chess == State.BLACK:
+            chess = State.WHITE
+        else:
+            chess = State.BLACK
+
+    for engine in engines.values():
+        engine.close()
+    for pool in root_pools.values():
+        pool.terminate()
+        pool.join()
+    return winner, movement_nums, search_times
+
+def _playGameWorker(task_queue, result_queue):
+    """
+    Play the games of `task_queue` (`(index, task)` pairs up to a None) in a
+    non-daemonic process, so engines may start worker processes of their own.
+    """
+    while True:
+        item = task_queue.get()
+        if item is None:
+            return
+        index, task = item
+        result_queue.put((index, playGame(task)))
+
+def playGamesInProcesses(tasks, worker_num):
+    """
+    Return the results of `playGame` of `tasks`, in order, played by
+    `worker_num` non-daemonic processes. The workers of a `Pool` are
+    daemonic and cannot start the pools of parallel engines.
+    """
+    task_queue = Queue()
+    result_queue = Queue()
+    processes = [Process(target=_playGameWorker, args=(task_queue, result_queue)) \
+                 for _ in range(min(worker_num, len(tasks)))]
+    for index, task in enumerate(tasks):
+        task_queue.put((index, task))
+    for process in processes:
+        task_queue.put(None)
+        process.start()
+
+    results = [None] * len(tasks)
+    for _ in range(len(tasks)):
+        index, result = result_queue.get()
+        results[index] = result
+    for process in processes:
+        process.join()
+    return results
+
+def runTournament(game_num, worker_num, a_setting, b_setting):
+    """
+    Play `game_num` games between engines A and B in `worker_num` processes,
+    A taking black in even games. Return `(results, elapsed seconds)`, the
+    results being those of `playGame`. Each game of parallel engines uses
+    their worker processes too, so `worker_num` may be lowered for them.
+    """
+    base_seed = getrandbits(32)
+    tasks = [(base_seed + i, a_setting, b_setting, i % 2 == 0) for i in range(game_num)]
+    time_start = time()
+    if checkParallel(a_setting) or checkParallel(b_setting):
+        results = playGamesInProcesses(tasks, worker_num)
+    else:
+        with Pool(worker_num) as pool:
+            results = pool.map(playGame, tasks)
+    return results, time() - time_start
+
+def computeElo(score):
+    """
+    Return the Elo difference of a score rate, clamped away from 0 and 1.
+    """
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * log10(1 / score - 1)
+
+def computeWilsonInterval(score, game_num):
+    """
+    Return the 95% Wilson score interval of a score rate over `game_num`
+    games. Unlike the normal interval, it does not collapse to a point when
+    the score is 0 or 1. Draws count as half a win, so the interval is a
+    little wider than that of the trinomial.
+    """
+    z_square = CONFIDENCE_Z ** 2
+    denominator = 1 + z_square / game_num
+    center = (score + z_square / (2 * game_num)) / denominator
+    margin = CONFIDENCE_Z / denominator * sqrt(score * (1 - score) / game_num + z_square / (4 * game_num ** 2))
+    return [max(0, center - margin), min(1, center + margin)]
+
+def summarizeResults(results, elapsed_time):
+    """
+    Return the summary of tournament results as a dict.
+    """
+    game_num = len(results)
+    wins = {'a': 0, 'b': 0, None: 0}
+    movement_nums = {'a': 0, 'b': 0}
+    search_times = {'a': 0, 'b': 0}
+    scores = []
+    for winner, game_movement_nums, game_search_times in results:
+        wins[winner] += 1
+        scores.append({'a': 1, 'b': 0, None: 0.5}[winner])
+        for player in ['a', 'b']:
+            movement_nums[player] += game_movement_nums[player]
+            search_times[player] += game_search_times[player]
+
+    score = sum(scores) / game_num
+    score_interval = computeWilsonInterval(score, game_num)
+    return {
+        'game_num': game_num,
+        'games_per_second': game_num / elapsed_time,
+        'a_win_num': wins['a'],
+        'b_win_num': wins['b'],
+        'draw_num': wins[None],
+        'a_score': score,
+        'a_score_interval': score_interval,
+        'elo_difference': computeElo(score),
+        'elo_interval': [computeElo(score_interval[0]), computeElo(score_interval[1])],
+        'a_time_per_movement': search_times['a'] / max(1, movement_nums['a']),
+        'b_time_per_movement': search_times['b'] / max(1, movement_nums['b']),
+    }
+
+def main():
+    """
+    Program entry.
+    """
+    parser = ArgumentParser(description='Play a headless engine-vs-engine tournament.')
+    parser.add_argument('--game-num', type=int, default=20, help='number of games')
+    parser.add_argument('--worker-num', type=int, default=cpu_count(), help='number of parallel games')
+    for player in ['a', 'b']:
+        parser.add_argument('--{}-node-limit'.format(player), type=int, default=None, \
+                            help='iterations per movement of engine {}'.format(player.upper()))
+        parser.add_argument('--{}-time-limit'.format(player), type=float, default=None, \
+                            help='seconds per movement of engine {}'.format(player.upper()))
+        parser.add_argument('--{}-policy'.format(player), choices=POLICIES, default='random', \
+                            help='playout policy of engine {}'.format(player.upper()))
+        parser.add_argument('--{}-widening'.format(player), action='store_true', \
+                            help='progressive widening for engine {}'.format(player.upper()))
+        parser.add_argument('--{}-leaf-worker-num'.format(player), type=int, default=1, \
+                            help='leaf-parallel playout processes of engine {}'.format(player.upper()))
+        parser.add_argument('--{}-root-worker-num'.format(player), type=int, default=1, \
+                            help='root-parallel search processes of engine {}'.format(player.upper()))
+    args = parser.parse_args()
+
+    settings = []
+    for player in ['a', 'b']:
+        setting = {'node_limit': getattr(args, '{}_node_limit'.format(player)), \
+                   'time_limit': getattr(args, '{}_time_limit'.format(player)), \
+                   'policy': getattr(args, '{}_policy'.format(player)), \
+                   'is_widening': getattr(args, '{}_widening'.format(player)), \
+                   'leaf_worker_num': getattr(args, '{}_leaf_worker_num'.format(player)), \
+                   'root_worker_num': getattr(args, '{}_root_worker_num'.format(player))}
+        if setting['root_worker_num'] > 1 and (setting['leaf_worker_num'] > 1 or setting['is_widening']):
+            parser.error('engine {}: root-parallel search takes neither leaf workers nor widening'.format( \
+                         player.upper()))
+        settings.append(setting)
+    results, elapsed_time = runTournament(args.game_num, args.worker_num, settings[0], settings[1])
+    summary = summarizeResults(results, elapsed_time)
+
+    print('Games: {} ({:.3f} games/s)'.format(summary['game_num'], summary['games_per_second']))
+    print('A wins: {}, B wins: {}, draws: {}'.format(summary['a_win_num'], summary['b_win_num'], \
+                                                     summary['draw_num']))
+    print('Score of A: {:.3f} (95% CI {:.3f} - {:.3f})'.format(summary['a_score'], *summary['a_score_interval']))
+    print('Elo difference (A - B): {:+.0f} (95% CI {:+.0f} - {:+.0f})'.format(summary['elo_difference'], \
+                                                                           *summary['elo_interval']))
+    print('Time per movement: A {:.3f} s, B {:.3f} s'.format(summary['a_time_per_movement'], \
+                                                            summary['b_time_per_movement']))
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,8 @@ class MainWindow(QMainWindow):
     signal_set_available_movement = pyqtSignal([int, int])
     # Sigbal. Call `aiTurnMonteCarloTreeSearch` function.
     signal_ai_turn = pyqtSignal()
+    # Signal. Call `cancelAiTurn` function.
+    signal_cancel_ai_turn = pyqtSignal()
     
     def setupUi(self, main_window):
         """
@@ -47,6 +49,8 @@ class MainWindow(QMainWindow):
 
         # Check if it's user's turn now.
         self.is_user_turn = True
+        # Check if the AI is searching its movement.
+        self.is_ai_thinking = False
         self.current_step = 0
         self.lasting_time = 0
         
@@ -58,6 +62,7 @@ class MainWindow(QMainWindow):
         
         # Clicked grid.
         self.from_grid = []
+        self.user_move = []
         self.ai_move = []
         
         # Chess images.
@@ -94,6 +99,7 @@ class MainWindow(QMainWindow):
         # Setup signals.
         self.signal_set_available_movement[int, int].connect(main_window.setAvailableMovement)
         self.signal_ai_turn.connect(main_window.aiTurnMonteCarloTreeSearch)
+        self.signal_cancel_ai_turn.connect(main_window.cancelAiTurn)
         
         self.setMouseTracking(True)
         
@@ -127,6 +133,26 @@ class MainWindow(QMainWindow):
         Setup Statusbar.
         """
         self.statusBar().showMessage(message)
+        
+    def showStatusbarMessage(self, message):
+        """
+        Setup the message shown after the past time, and show it now.
+        """
+        self.statusbar_msg = message
+        self.setStatusbur('Past time: %s. ' % self.past_time + message)
+        
+    def showSearchStatistics(self, summary):
+        """
+        Show the statistics of the last search as the tooltip of Statusbar.
+        """
+        self.statusBar().setToolTip(summary)
+        
+    def showMoveMessage(self):
+        """
+        Show the movements of the last step.
+        """
+        self.showStatusbarMessage('Steps: {}. Black: ({}, {}) -> ({}, {}); White: ({}, {}) -> ({}, {}). Computed time: {}s.'.format( \
+                                  self.current_step, self.user_move[0][0] + 1, self.user_move[0][1] + 1, self.user_move[1][0] + 1, self.user_move[1][1] + 1, self.ai_move[0][1] + 1, self.ai_move[0][0] + 1, self.ai_move[1][1] + 1, self.ai_move[1][0] + 1, self.lasting_time))
     
     def checkChessMove(self, from_grid, from_chess, to_grid):
         """
@@ -190,6 +216,7 @@ class MainWindow(QMainWindow):
                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
             
             if reply == QMessageBox.Yes:
+                self.signal_cancel_ai_turn.emit()
                 self.chessboard.resetChessboard()
                 self.resetChess()
                 self.update()
@@ -217,12 +244,11 @@ class MainWindow(QMainWindow):
                     self.chessboard.setCoordinateState(grid_x, grid_y, State.BLACK)
                     self.drawChess(grid_x, grid_y, State.BLACK)      
                     self.is_user_turn = False
+                    self.is_ai_thinking = True
                     self.current_step += 1
-                    self.signal_ai_turn.emit()
-                    
-                    self.statusbar_msg = 'Steps: {}. Black: ({}, {}) -> ({}, {}); White: ({}, {}) -> ({}, {}). Computed time: {}s.'.format( \
-                                      self.current_step, self.from_grid[0] + 1, self.from_grid[1] + 1, grid_x + 1, grid_y + 1, self.ai_move[0][0] + 1, self.ai_move[0][1] + 1, self.ai_move[1][0] + 1, self.ai_move[1][1] + 1, self.lasting_time)
+                    self.user_move = [self.from_grid[0: 2], [grid_x, grid_y]]
                     self.past_time = 0
+                    self.signal_ai_turn.emit()
                 else:
                     if self.from_grid[2] != State.EMPTY:
                         self.drawChess(self.from_grid[0], self.from_grid[1], self.from_grid[2])
@@ -301,6 +327,7 @@ class MainWindow(QMainWindow):
         play again.
         """
         self.timer.stop()
+        self.signal_cancel_ai_turn.emit()
         
         if winner == State.BLACK:
             reply = QMessageBox.question(self, 'Restart', 'Congrats! You win this game.\nPlay again?', \
@@ -345,12 +372,16 @@ class MainWindow(QMainWindow):
         reply = QMessageBox.question(self, 'Quit', 'Are you sure?', \
                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
         if reply == QMessageBox.Yes:
+            self.signal_cancel_ai_turn.emit()
             event.accept()
         else:
             self.timer.start(1000)
             event.ignore()
             
     def timerRun(self):
+        # The clock of the user stops while the AI is thinking.
+        if self.is_ai_thinking:
+            return
         if self.past_time == 60:
             self.gameEnd(State.WHITE)
         else:
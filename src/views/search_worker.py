@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from src.models.monte_carlo_tree_search import findMostVisitedChild
+from src.models.node_pool import NodePool
+from src.models.time_manager import TimeManager
+from time import time
+
+class SearchWorker(QThread):
+    """ Class
+    Run the search of a `SearchEngine` off the GUI thread. Progress and the
+    result are sent back by signals, and the search can be cancelled. While
+    the opponent thinks, the worker can ponder (search the position without
+    a time limit or a result) until the next search or a cancellation.
+    """
+    # Signal. Iterations, iterations per second, current best movement
+    # (`[[row, column], [row, column]]`) and its visited times.
+    signal_progress = pyqtSignal([int, float, list, int])
+    # Signal. The best movement (or None) and the computed time in seconds.
+    signal_result = pyqtSignal([object, float])
+    
+    def __init__(self, search_engine, parent=None):
+        super(SearchWorker, self).__init__(parent)
+        self._search_engine = search_engine
+        self._chessboard = None
+        self._chess = None
+        self._time_manager = None
+        self._is_cancelled = False
+        self._is_pondering = False
+        
+    def startSearch(self, chessboard, chess, time_limit):
+        """
+        Start searching the movement of `chess` on a copy of `chessboard`. A
+        running ponder is stopped first.
+        """
+        self.cancelSearch()
+        self._chessboard = chessboard.copyChessboard()
+        self._chess = chess
+        self._time_manager = TimeManager(time_limit)
+        self._is_cancelled = False
+        self._is_pondering = False
+        self.start()
+        
+    def startPonder(self, chessboard, chess):
+        """
+        Start pondering a copy of `chessboard` with `chess` (the opponent) to
+        move, until `startSearch` or `cancelSearch`.
+        """
+        self.cancelSearch()
+        self._chessboard = chessboard.copyChessboard()
+        self._chess = chess
+        self._time_manager = TimeManager()
+        self._is_cancelled = False
+        self._is_pondering = True
+        self.start()
+        
+    def cancelSearch(self):
+        """
+        Cancel the running search and wait for the thread to finish. No result
+        is sent for a cancelled search.
+        """
+        self._is_cancelled = True
+        if self._time_manager is not None:
+            self._time_manager.stopSearch()
+        self.wait()
+        
+    def run(self):
+        """
+        Thread function.
+        """
+        if self._is_pondering:
+            self._search_engine.ponderPosition(self._chessboard, self._chess, self._time_manager)
+            return
+        
+        time_start = time()
+        best_movement = self._search_engine.searchMovement(self._chessboard, self._chess, \
+                                                           progress_callback=self._reportProgress, \
+                                                           time_manager=self._time_manager)
+        time_end = time()
+        
+        if not self._is_cancelled:
+            self.signal_result.emit(best_movement, time_end - time_start)
+        
+    def _reportProgress(self, iterations, elapsed_time, node_pool, root_node):
+        """
+        Send the progress of the search.
+        """
+        best_child_node = findMostVisitedChild(node_pool, root_node)
+        if best_child_node == NodePool.NULL_NODE:
+            return
+        self.signal_progress.emit(iterations, iterations / elapsed_time, \
+                                  node_pool.getBestMovement(best_child_node), \
+                                  node_pool.getVisitedTimes(best_child_node))